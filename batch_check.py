@@ -0,0 +1,398 @@
+"""
+Checks many files without the UI and writes the results as JSON lines.
+
+    python batch_check.py project/ "exports/**/*.mxliff" -l de-DE -o results.jsonl
+
+For every file there is one line per segment with matches and a summary line.
+PySide6 is never imported, so this runs on machines without a display.
+
+With --source-language, the source column of table templates is checked
+too, on its own checker at the same time as the target, and there is one
+line per segment pair with matches on either side.
+
+With --languages de-DE,en-US,fr-FR,es-ES the language of every segment is
+detected, segments go to the checker of their language and those in other
+languages are skipped.
+
+With --server http://localhost:8081 the checks go to a long-running
+LanguageTool server shared with other runs and the editor, which is started
+if it is not running yet.
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import shlex
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from bilingual import check_pairs, matches_by_pair
+from check_engine import CheckStats, Segment, iter_segments
+from checker_pool import CheckerPool
+from language_id import check_languages, route_segments
+from lt_server import LanguageToolServer, ServerChecker
+from markup import OffsetMap, iter_stripped
+from match_cache import MatchCache, checker_config, open_cache
+from templates import find_template, load_templates, templates
+
+EXTENSIONS = {"txt", "docx", "doc", "rtf", "xliff", "mxliff"}
+
+# Per worker process state, set up by init_worker
+_pool: Optional[CheckerPool] = None
+_cache: Optional[MatchCache] = None
+_options: Dict[str, Any] = {}
+
+
+def find_files(patterns: Iterable[str]) -> List[str]:
+    """
+    Expands directories (recursively) and glob patterns to a sorted list of
+    files with a supported extension.
+    """
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                for name in names:
+                    if name.rsplit(".", 1)[-1].lower() in EXTENSIONS:
+                        files.add(os.path.join(root, name))
+        else:
+            for path in glob.glob(pattern, recursive=True):
+                if os.path.isfile(path):
+                    files.add(path)
+    return sorted(files)
+
+
+def server_url(checker: Any) -> Optional[str]:
+    """
+    Returns the address of the LanguageTool server a checker talks to, so
+    other processes can use the same server.
+    """
+    if isinstance(checker, ServerChecker):
+        return checker.url
+    url = getattr(checker, "_url", None)
+    if not url:
+        return None
+    return url.rsplit("v2/", 1)[0].rstrip("/")
+
+
+def setup_logging(level: str) -> None:
+    logging.basicConfig(
+        level=level.upper(),
+        format="%(asctime)s %(processName)s %(levelname)s %(name)s: %(message)s",
+    )
+
+
+def init_worker(options: Dict[str, Any], url: Optional[str]) -> None:
+    global _pool, _cache, _options
+    _options = options
+    setup_logging(options["log_level"])
+    _cache = open_cache(options["cache"], options["cache_size"])
+
+    if url and options["server"]:
+        # Requests of all processes go to the shared server
+        server = LanguageToolServer(
+            url,
+            command=options["server_command"],
+            max_connections=options["threads"],
+            health_interval=0,
+        )
+        _pool = CheckerPool(factory=server.checker)
+    elif url:
+        # Share the warm server of the main process
+        def factory(language: str) -> Any:
+            import language_tool_python  # type: ignore
+
+            return language_tool_python.LanguageTool(language, remote_server=url)
+
+        _pool = CheckerPool(factory=factory)
+    else:
+        _pool = CheckerPool()
+
+
+def check_file(file_name: str) -> Tuple[bool, List[str]]:
+    """
+    Loads and checks one file in a worker process. Returns whether that
+    worked and the JSON lines for the file.
+    """
+    from file_handler import (
+        TEMPLATE_EXTENSIONS,
+        FileHandler,
+        file_extension,
+        is_plain_text,
+    )
+
+    pool = _pool
+    assert pool is not None
+    language = _options["language"]
+    started = time.perf_counter()
+
+    handler = FileHandler(_options["template"])
+    if (
+        _options["source_language"]
+        and handler.plan is not None
+        and file_extension(file_name) in TEMPLATE_EXTENSIONS
+    ):
+        return check_pair_file(file_name, handler, started)
+
+    # Plain text is decoded again for the output instead of being kept in
+    # memory, other formats are extracted as a whole anyway
+    text: Optional[str] = None
+
+    def read_segments() -> Iterator[Segment]:
+        if text is None:
+            return iter_segments(handler.iter_chunks(file_name))
+        return iter_segments([text])
+
+    try:
+        if not is_plain_text(file_name):
+            text = handler.load_file(file_name)
+        stats = CheckStats()
+        # Offsets in the output stay those of the loaded text
+        segments = read_segments()
+        offset_map: Optional[OffsetMap] = None
+        if _options["remove_tags"]:
+            offset_map = OffsetMap()
+            segments = iter_stripped(segments, offset_map)
+
+        groups: Mapping[str, Iterable[Segment]] = {language: segments}
+        if _options["languages"]:
+            groups, skipped = route_segments(segments, language, _options["languages"])
+            stats.skipped = len(skipped)
+
+        matches = check_languages(
+            groups,
+            lambda language: pool.checkers(language, 1),
+            workers=_options["threads"],
+            cache=_cache,
+            stats=stats,
+            offset_map=offset_map,
+        )
+    except Exception as e:
+        return False, [json.dumps({"file": file_name, "error": str(e)})]
+
+    lines = []
+    count = 0
+    next_match = 0
+    for index, segment in enumerate(read_segments()):
+        count += 1
+        first = next_match
+        # Matches are sorted and end at the line break of their segment
+        end = segment.offset + len(segment.text) + 1
+        while next_match < len(matches) and matches[next_match].offset < end:
+            next_match += 1
+        if first == next_match:
+            continue
+        lines.append(
+            json.dumps(
+                {
+                    "file": file_name,
+                    "segment": index,
+                    "offset": segment.offset,
+                    "text": segment.text,
+                    "matches": [
+                        record.to_dict() for record in matches[first:next_match]
+                    ],
+                },
+                ensure_ascii=False,
+            )
+        )
+
+    lines.append(
+        json.dumps(
+            {
+                "file": file_name,
+                "segments": count,
+                "matches": len(matches),
+                "cached": stats.cached,
+                "repeated": stats.repeated,
+                "skipped": stats.skipped,
+                "seconds": round(time.perf_counter() - started, 3),
+            }
+        )
+    )
+    return True, lines
+
+
+def check_pair_file(
+    file_name: str, handler: Any, started: float
+) -> Tuple[bool, List[str]]:
+    """
+    Checks the targets and sources of a bilingual table, match offsets are
+    relative to the cell text.
+    """
+    assert _pool is not None
+    language = _options["language"]
+    source_language = _options["source_language"]
+    stats = CheckStats()
+    source_stats = CheckStats()
+
+    try:
+        pairs = handler.read_pairs(file_name)
+        with _pool.checker(language) as checker, _pool.checker(
+            source_language
+        ) as source_checker:
+            matches, source_matches = check_pairs(
+                pairs,
+                [checker],
+                [source_checker],
+                workers=_options["threads"],
+                cache=_cache,
+                cache_config=checker_config(language, checker),
+                source_cache_config=checker_config(source_language, source_checker),
+                remove_tags=_options["remove_tags"],
+                stats=stats,
+                source_stats=source_stats,
+            )
+    except Exception as e:
+        return False, [json.dumps({"file": file_name, "error": str(e)})]
+
+    target_records = matches_by_pair([pair.target for pair in pairs], matches)
+    source_records = matches_by_pair([pair.source for pair in pairs], source_matches)
+
+    lines = []
+    for index in sorted(target_records.keys() | source_records.keys()):
+        pair = pairs[index]
+        lines.append(
+            json.dumps(
+                {
+                    "file": file_name,
+                    "pair": index,
+                    "id": pair.id,
+                    "status": pair.status,
+                    "source": pair.source,
+                    "target": pair.target,
+                    "matches": [r.to_dict() for r in target_records.get(index, [])],
+                    "source_matches": [
+                        r.to_dict() for r in source_records.get(index, [])
+                    ],
+                },
+                ensure_ascii=False,
+            )
+        )
+
+    lines.append(
+        json.dumps(
+            {
+                "file": file_name,
+                "pairs": len(pairs),
+                "matches": len(matches),
+                "source_matches": len(source_matches),
+                "cached": stats.cached + source_stats.cached,
+                "repeated": stats.repeated + source_stats.repeated,
+                "seconds": round(time.perf_counter() - started, 3),
+            }
+        )
+    )
+    return True, lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("paths", nargs="+", help="files, directories or globs")
+    parser.add_argument("-l", "--language", default="de-DE")
+    parser.add_argument(
+        "-s", "--source-language", help="also check the source column, e.g. en-US"
+    )
+    parser.add_argument(
+        "-t",
+        "--template",
+        default=templates[0]["name"],
+        help="name of a built-in or loaded template",
+    )
+    parser.add_argument("--templates", help="JSON file with more templates")
+    parser.add_argument("--remove-tags", action="store_true")
+    parser.add_argument(
+        "--languages",
+        help="comma-separated languages segments are routed to by their language",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1, help="processes"
+    )
+    parser.add_argument(
+        "--threads", type=int, default=4, help="parallel requests per process"
+    )
+    parser.add_argument(
+        "--server", help="shared LanguageTool server, started if not running"
+    )
+    parser.add_argument("--server-command", help="command that starts the server")
+    parser.add_argument("--cache", help="match cache file (SQLite)")
+    parser.add_argument("--cache-size", type=int, default=200000)
+    parser.add_argument("-o", "--output", help="JSONL file, default stdout")
+    parser.add_argument(
+        "--log-level", default="WARNING", help="DEBUG logs the duration of phases"
+    )
+    args = parser.parse_args(argv)
+
+    setup_logging(args.log_level)
+
+    if args.templates:
+        try:
+            load_templates(args.templates)
+        except (OSError, ValueError) as e:
+            parser.error(f"Cannot load templates: {e}")
+    template = find_template(args.template)
+    if template is None:
+        names = ", ".join(template["name"] for template in templates)
+        parser.error(f"Unknown template {args.template}, choose from {names}")
+
+    files = find_files(args.paths)
+    if not files:
+        print("No files found", file=sys.stderr)
+        return 1
+
+    options = {
+        "language": args.language,
+        "source_language": args.source_language,
+        "languages": args.languages.split(",") if args.languages else None,
+        "template": template,
+        "remove_tags": args.remove_tags,
+        "threads": args.threads,
+        "cache": args.cache,
+        "cache_size": args.cache_size,
+        "log_level": args.log_level,
+        "server": bool(args.server),
+        "server_command": (
+            shlex.split(args.server_command) if args.server_command else None
+        ),
+    }
+
+    # One warm server, used by all workers
+    if args.server:
+        server = LanguageToolServer(
+            args.server, command=options["server_command"], health_interval=0
+        )
+        main_pool = CheckerPool(factory=server.checker)
+    else:
+        main_pool = CheckerPool()
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    failed = False
+    try:
+        with main_pool.checker(args.language) as checker:
+            url = server_url(checker)
+            with ProcessPoolExecutor(
+                max_workers=min(args.jobs, len(files)),
+                initializer=init_worker,
+                initargs=(options, url),
+            ) as executor:
+                results = executor.map(check_file, files)
+                for file_name, (ok, lines) in zip(files, results):
+                    for line in lines:
+                        output.write(line + "\n")
+                    failed = failed or not ok
+                    print(f"Checked {file_name}", file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        main_pool.shutdown()
+        if args.server:
+            server.stop()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
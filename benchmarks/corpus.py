@@ -0,0 +1,155 @@
+import random
+import zipfile
+from typing import Any, Dict, List, Tuple
+from xml.sax.saxutils import escape
+
+from benchmarks.stub_checker import TYPOS
+
+WORDS = (
+    "the of and to in is that for it as with was on be by this are from "
+    "file project translation segment target source check window menu "
+    "der die das und ist nicht mit für auf eine werden Datei Projekt "
+    "Übersetzung Fenster Eintrag Zeile prüfen speichern öffnen"
+).split()
+
+TAGS = ["<b>", "</b>", "<ph id=\"1\"/>", "{0}", "%s"]
+
+
+def make_segments(count: int, seed: int = 1) -> List[Tuple[str, str]]:
+    """
+    Returns count deterministic (source, target) pairs. Targets contain a
+    few typos, repeated spaces and inline tags, and some repeat.
+    """
+    rng = random.Random(seed)
+    typos = list(TYPOS)
+    segments: List[Tuple[str, str]] = []
+
+    for i in range(count):
+        if segments and rng.random() < 0.2:
+            # Translation files repeat headers and UI strings
+            segments.append(segments[rng.randrange(len(segments))])
+            continue
+
+        words = [rng.choice(WORDS) for _ in range(rng.randint(4, 25))]
+        source = " ".join(words).capitalize() + "."
+        if rng.random() < 0.3:
+            words[rng.randrange(len(words))] = rng.choice(typos)
+        if rng.random() < 0.1:
+            words.insert(rng.randrange(len(words)), rng.choice(TAGS))
+        target = " ".join(words).capitalize() + "."
+        if rng.random() < 0.05:
+            target = target.replace(" ", "  ", 1)
+        segments.append((source, target))
+
+    return segments
+
+
+def write_text(path: str, segments: List[Tuple[str, str]]) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        for _, target in segments:
+            file.write(target + "\n")
+
+
+def write_xliff(path: str, segments: List[Tuple[str, str]], version: str) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        if version == "2.0":
+            file.write(
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<xliff xmlns="urn:oasis:names:tc:xliff:document:2.0" '
+                'version="2.0" srcLang="en" trgLang="de"><file id="f1">\n'
+            )
+            for i, (source, target) in enumerate(segments):
+                file.write(
+                    f'<unit id="{i}"><segment><source>{escape(source)}</source>'
+                    f"<target>{escape(target)}</target></segment></unit>\n"
+                )
+            file.write("</file></xliff>\n")
+            return
+
+        file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<xliff xmlns="urn:oasis:names:tc:xliff:document:1.2" '
+            'xmlns:m="http://www.memsource.com/mxlf/2.0" version="1.2">'
+            '<file source-language="en" target-language="de"><body>\n'
+        )
+        for i, (source, target) in enumerate(segments):
+            file.write(
+                f'<trans-unit id="{i}" m:score="0.0"><source>{escape(source)}</source>'
+                f"<target>{escape(target)}</target></trans-unit>\n"
+            )
+        file.write("</body></file></xliff>\n")
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    "<Relationships "
+    'xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    "</Relationships>"
+)
+_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    "<Relationships "
+    'xmlns="http://schemas.openxmlformats.org/package/2006/relationships"/>'
+)
+_DOCUMENT_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    "<w:document "
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    "<w:body>"
+)
+_DOCUMENT_END = "<w:sectPr/></w:body></w:document>"
+
+
+def _paragraph(text: str) -> str:
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def write_docx(
+    path: str, segments: List[Tuple[str, str]], template: Dict[str, Any]
+) -> None:
+    """
+    Writes a minimal DOCX with the layout of the template: a bilingual table
+    for table templates, one paragraph per segment for simple ones.
+    """
+    parts = [_DOCUMENT_START]
+
+    if template.get("simple", True):
+        parts.extend(_paragraph(target) for _, target in segments)
+    else:
+        # Tables before the one the template reads
+        for _ in range(template["row"]):
+            parts.append(f"<w:tbl><w:tr><w:tc>{_paragraph('')}</w:tc></w:tr></w:tbl>")
+
+        columns = max(template["source_col_index"], template["target_col_index"]) + 1
+        parts.append("<w:tbl>")
+        for i, (source, target) in enumerate(segments):
+            cells = [str(i + 1)] * columns
+            cells[template["source_col_index"]] = source
+            cells[template["target_col_index"]] = target
+            parts.append(
+                "<w:tr>"
+                + "".join(f"<w:tc>{_paragraph(cell)}</w:tc>" for cell in cells)
+                + "</w:tr>"
+            )
+        parts.append("</w:tbl>")
+
+    parts.append(_DOCUMENT_END)
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _RELS)
+        archive.writestr("word/_rels/document.xml.rels", _DOCUMENT_RELS)
+        archive.writestr("word/document.xml", "".join(parts))
@@ -0,0 +1,377 @@
+"""
+Times the load, tag removal, check, render, scroll and error list phases on
+synthetic corpora and writes a JSON report.
+
+    python -m benchmarks.run --sizes 1000,10000 -o report.json
+    python -m benchmarks.run -o new.json --compare report.json
+
+Everything runs offline: LanguageTool is replaced by a deterministic stub
+checker, and Qt phases run on the offscreen platform (they are skipped if
+PySide6 is missing). With --http the check goes through LanguageToolServer to
+a local stub server instead.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from bisect import bisect_right
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks import corpus
+from benchmarks.stub_checker import StubChecker
+from benchmarks.stub_server import start_stub_server
+from check_engine import CheckStats, Segment, check_segments, split_segments
+from lt_server import LanguageToolServer
+from markup import strip_segments
+from match_store import MatchRecord, MatchStore
+from templates import templates
+
+
+def timed(function: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    """
+    Runs function repeat times and returns the fastest time and the result.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+class Report:
+    def __init__(self) -> None:
+        self.results: List[Dict[str, Any]] = []
+
+    def add(
+        self, corpus_name: str, size: int, phase: str, seconds: float, **extra: Any
+    ) -> None:
+        self.results.append(
+            {
+                "corpus": corpus_name,
+                "size": size,
+                "phase": phase,
+                "seconds": round(seconds, 6),
+                **extra,
+            }
+        )
+        print(
+            f"{corpus_name:>20} {size:>7} {phase:<12} {seconds * 1000:10.1f} ms",
+            file=sys.stderr,
+        )
+
+    def skip(self, corpus_name: str, size: int, phase: str, reason: str) -> None:
+        self.results.append(
+            {"corpus": corpus_name, "size": size, "phase": phase, "skipped": reason}
+        )
+        print(
+            f"{corpus_name:>20} {size:>7} {phase:<12} skipped: {reason}",
+            file=sys.stderr,
+        )
+
+
+def corpora() -> List[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Returns (name, file extension, template) of every corpus: plain text,
+    XLIFF 1.2 / 2.0, MXLIFF and a DOCX per template.
+    """
+    general = next(template for template in templates if template.get("simple"))
+    result = [
+        ("text", "txt", general),
+        ("xliff-1.2", "xliff", general),
+        ("xliff-2.0", "xliff", general),
+        ("mxliff", "mxliff", general),
+    ]
+    for template in templates:
+        name = "docx-" + template["name"].lower().replace(" ", "-")
+        result.append((name, "docx", template))
+    return result
+
+
+def write_corpus(
+    name: str, path: str, segments: List[Tuple[str, str]], template: Dict[str, Any]
+) -> None:
+    if name == "text":
+        corpus.write_text(path, segments)
+    elif name == "xliff-2.0":
+        corpus.write_xliff(path, segments, "2.0")
+    elif name in ("xliff-1.2", "mxliff"):
+        corpus.write_xliff(path, segments, "1.2")
+    else:
+        corpus.write_docx(path, segments, template)
+
+
+def errors_by_text(
+    text: str, matches: List[MatchRecord]
+) -> Dict[str, List[MatchRecord]]:
+    """
+    Returns the errors of every line relative to the line start, keyed by the
+    line text like TextEditor.block_errors.
+    """
+    segments = split_segments(text)
+    starts = [segment.offset for segment in segments]
+    segment_errors: List[List[MatchRecord]] = [[] for _ in segments]
+    for record in matches:
+        index = bisect_right(starts, record.offset) - 1
+        segment_errors[index].append(record.moved(record.offset - starts[index]))
+
+    block_errors: Dict[str, List[MatchRecord]] = {}
+    for segment, errors in zip(segments, segment_errors):
+        block_errors.setdefault(segment.text, errors)
+    return block_errors
+
+
+def qt_application() -> Optional[Any]:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PySide6.QtWidgets import QApplication
+    except ImportError:
+        return None
+    return QApplication.instance() or QApplication([])
+
+
+def bench_render(
+    report: Report,
+    name: str,
+    size: int,
+    text: str,
+    matches: List[MatchRecord],
+    repeat: int,
+) -> None:
+    if qt_application() is None:
+        for phase in ("render", "scroll", "error_list"):
+            report.skip(name, size, phase, "PySide6 is not installed")
+        return
+
+    from PySide6.QtWidgets import QTextEdit
+
+    from error_highlighter import ErrorHighlighter
+
+    block_errors = errors_by_text(text, matches)
+
+    def render() -> ErrorHighlighter:
+        text_edit = QTextEdit()
+        text_edit.resize(800, 600)
+        text_edit.show()
+        highlighter = ErrorHighlighter(text_edit, block_errors.get)
+        text_edit.setPlainText(text)
+        highlighter.highlightViewport()
+        return highlighter
+
+    # Showing the text with the errors of the first page highlighted
+    seconds, highlighter = timed(render, repeat)
+    report.add(name, size, "render", seconds, characters=len(text))
+
+    def scroll() -> int:
+        scroll_bar = highlighter.text_edit.verticalScrollBar()
+        for value in range(0, scroll_bar.maximum() + 1, scroll_bar.pageStep()):
+            scroll_bar.setValue(value)
+            highlighter.highlightViewport()
+        return highlighter.highlightedBlocks()
+
+    # Scrolling through the whole text, the highlighted blocks stay bounded
+    seconds, blocks = timed(scroll, 1)
+    report.add(name, size, "scroll", seconds, highlighted_blocks=blocks)
+    highlighter.text_edit.close()
+
+    store = MatchStore(matches)
+
+    from error_list_model import ErrorListModel
+
+    def fill_error_list() -> int:
+        model = ErrorListModel()
+        model.setMatchStore(store)
+        while model.canFetchMore():
+            model.fetchMore()
+        # The view asks for the visible rows only
+        for row in range(min(model.rowCount(), 50)):
+            for column in range(model.columnCount()):
+                model.data(model.index(row, column))
+        return model.rowCount()
+
+    seconds, rows = timed(fill_error_list, repeat)
+    report.add(name, size, "error_list", seconds, rows=rows)
+
+
+def bench_corpus(
+    report: Report,
+    name: str,
+    extension: str,
+    template: Dict[str, Any],
+    size: int,
+    directory: str,
+    args: argparse.Namespace,
+) -> None:
+    segments = corpus.make_segments(size)
+    path = os.path.join(directory, f"{name}-{size}.{extension}")
+    write_corpus(name, path, segments, template)
+
+    try:
+        from file_handler import FileHandler
+
+        seconds, text = timed(
+            lambda: FileHandler(template).load_file(path), args.repeat
+        )
+        report.add(name, size, "load", seconds, bytes=os.path.getsize(path))
+    except ImportError as e:
+        # Check and render the generated text anyway
+        report.skip(name, size, "load", f"missing dependency: {e.name}")
+        text = "".join(f"{target}\n" for _, target in segments)
+
+    # Matches are moved back to the loaded text, which is rendered
+    text_segments = split_segments(text)
+    seconds, (stripped, offset_map) = timed(
+        lambda: strip_segments(text_segments), args.repeat
+    )
+    report.add(name, size, "strip_tags", seconds, map_entries=len(offset_map))
+
+    checker: Any
+    if args.http:
+        stub_server = start_stub_server(latency_per_1k=args.latency)
+        server = LanguageToolServer(
+            stub_server.url,
+            start=False,
+            max_connections=args.workers,
+            health_interval=0,
+        )
+        checker = server.checker("en-US")
+    else:
+        checker = StubChecker(latency_per_1k=args.latency)
+    first_batch: List[float] = []
+    stats = CheckStats()
+
+    def check() -> List[MatchRecord]:
+        started = time.perf_counter()
+        first_batch.clear()
+
+        def on_batch(segments: List[Segment], matches: List[MatchRecord]) -> None:
+            if not first_batch:
+                first_batch.append(time.perf_counter() - started)
+
+        return check_segments(
+            stripped,
+            [checker],
+            workers=args.workers,
+            on_batch=on_batch,
+            stats=stats,
+            offset_map=offset_map,
+        )
+
+    seconds, matches = timed(check, args.repeat)
+    if args.http:
+        requests = server.requests
+        server.close()
+        stub_server.shutdown()
+        stub_server.server_close()
+    else:
+        requests = checker.requests
+    report.add(
+        name,
+        size,
+        "check",
+        seconds,
+        matches=len(matches),
+        requests=requests // args.repeat,
+        repeated=stats.repeated,
+        first_batch=round(first_batch[0], 6) if first_batch else None,
+    )
+
+    bench_render(report, name, size, text, matches, args.repeat)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)
+
+    def key(result: Dict[str, Any]) -> Tuple[str, int, str]:
+        return result["corpus"], result["size"], result["phase"]
+
+    old = {key(result): result for result in baseline["results"] if "seconds" in result}
+    print(f"\nCompared to {baseline_path} ({baseline['meta'].get('commit', '')}):")
+    for result in results:
+        previous = old.get(key(result))
+        if previous is None or "seconds" not in result or not previous["seconds"]:
+            continue
+        ratio = result["seconds"] / previous["seconds"]
+        marker = "  slower" if ratio > 1.1 else ""
+        print(
+            f"{result['corpus']:>20} {result['size']:>7} {result['phase']:<12}"
+            f" {ratio:6.2f}x{marker}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", default="1000,10000", help="segments per corpus")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0,
+        help="simulated checker seconds per 1000 characters",
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--http", action="store_true", help="check through a local stub server"
+    )
+    parser.add_argument("--only", help="comma separated corpus names")
+    parser.add_argument("-o", "--output", help="JSON report, default stdout")
+    parser.add_argument("--compare", help="earlier JSON report")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    only = set(args.only.split(",")) if args.only else None
+
+    report = Report()
+    with tempfile.TemporaryDirectory() as directory:
+        for name, extension, template in corpora():
+            if only and name not in only:
+                continue
+            for size in sizes:
+                bench_corpus(report, name, extension, template, size, directory, args)
+
+    data = {
+        "meta": {
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": args.repeat,
+            "latency": args.latency,
+            "workers": args.workers,
+            "http": args.http,
+        },
+        "results": report.results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+    else:
+        json.dump(data, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        compare(report.results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Measures cold start in fresh interpreters and checks it against a budget.
+
+    python -m benchmarks.startup --budget-ms 1500 -o startup.json
+
+"import" times importing the loading and checking modules, "first_paint" times
+creating the main window until its first paint on the offscreen platform
+(skipped if PySide6 is missing). Format libraries and LanguageTool must not
+be imported by either. No checker may start before the first paint, and the
+warm-up must start once the event loop runs. The window uses throwaway
+settings and caches.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+from benchmarks.run import Report, git_commit
+
+# Imported when a file of their type is opened or a checker is started
+HEAVY_MODULES = ["aspose", "docx", "docx2python", "language_tool_python"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import check_engine, checker_pool, file_handler, match_cache, templates
+seconds = time.perf_counter() - started
+print(json.dumps({"seconds": seconds, "modules": sorted(sys.modules)}))
+"""
+
+FIRST_PAINT_SCRIPT = """
+import json, os, shutil, sys, tempfile, threading, time
+os.environ["QT_QPA_PLATFORM"] = "offscreen"
+started = time.perf_counter()
+try:
+    from PySide6.QtCore import QSettings
+    from PySide6.QtWidgets import QApplication
+except ImportError:
+    print(json.dumps({"skipped": "PySide6 is not installed"}))
+    sys.exit()
+
+import checker_pool
+from benchmarks.stub_checker import StubChecker
+
+# The warm-up runs after the first paint, it must not start a real server
+checker_pool.create_language_tool = lambda language: StubChecker(language)
+
+# Closing the window saves the settings and the caches live next to them, so
+# keep both away from the real ones
+config_dir = tempfile.mkdtemp(prefix="pyLanguageTool-startup-")
+for settings_format in (QSettings.Format.NativeFormat, QSettings.Format.IniFormat):
+    QSettings.setPath(settings_format, QSettings.Scope.UserScope, config_dir)
+QApplication.setOrganizationName("pyLanguageTool benchmark")
+QApplication.setApplicationName("startup")
+
+app = QApplication([])
+from text_editor import TextEditor
+
+editor = TextEditor()
+editor.repaint()
+seconds = time.perf_counter() - started
+started_checkers = editor.checker_pool.languages()
+
+# Run the timers queued during startup once, the warm-up has to start now
+app.processEvents()
+for thread in threading.enumerate():
+    if thread.name.startswith("warm-up"):
+        thread.join()
+warmed_up = editor.checker_pool.languages()
+
+modules = sorted(sys.modules)
+editor.close()
+shutil.rmtree(config_dir, ignore_errors=True)
+print(json.dumps({
+    "seconds": seconds,
+    "modules": modules,
+    "checkers": started_checkers,
+    "warmed_up": warmed_up,
+}))
+"""
+
+
+def run_script(script: str) -> Dict[str, Any]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        cwd=root,
+        env={**os.environ, "PYTHONPATH": root},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(
+    report: Report, phase: str, script: str, repeat: int, budget: float
+) -> bool:
+    """
+    Runs the script repeat times and adds the fastest run to the report.
+    Returns whether it stayed within the budget and imported no heavy module.
+    """
+    runs: List[Dict[str, Any]] = []
+    for _ in range(repeat):
+        result = run_script(script)
+        if "skipped" in result:
+            report.skip("startup", 0, phase, result["skipped"])
+            return True
+        runs.append(result)
+
+    best = min(runs, key=lambda result: result["seconds"])
+    heavy = sorted(
+        {
+            name
+            for result in runs
+            for name in result["modules"]
+            if name.split(".")[0] in HEAVY_MODULES
+        }
+    )
+    over_budget = best["seconds"] * 1000 > budget
+    report.add(
+        "startup",
+        0,
+        phase,
+        best["seconds"],
+        budget_ms=budget,
+        over_budget=over_budget,
+        heavy_modules=heavy,
+        checkers=best.get("checkers", []),
+        warmed_up=best.get("warmed_up", []),
+    )
+    if heavy:
+        print(f"{phase}: imported {', '.join(heavy)}", file=sys.stderr)
+    early = bool(best.get("checkers"))
+    if early:
+        print(f"{phase}: checkers started before the first paint", file=sys.stderr)
+    # Only the first paint script starts the warm-up
+    no_warm_up = "warmed_up" in best and not best["warmed_up"]
+    if no_warm_up:
+        print(f"{phase}: no checker warmed up after the first paint", file=sys.stderr)
+    return not over_budget and not heavy and not early and not no_warm_up
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--import-budget-ms", type=float, default=300, help="budget for imports"
+    )
+    parser.add_argument(
+        "--budget-ms", type=float, default=1500, help="budget for the first paint"
+    )
+    parser.add_argument("-o", "--output", help="JSON report, default stdout")
+    args = parser.parse_args(argv)
+
+    report = Report()
+    ok = measure(report, "import", IMPORT_SCRIPT, args.repeat, args.import_budget_ms)
+    ok = (
+        measure(report, "first_paint", FIRST_PAINT_SCRIPT, args.repeat, args.budget_ms)
+        and ok
+    )
+
+    data = {
+        "meta": {"commit": git_commit(), "python": sys.version.split()[0]},
+        "results": report.results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+    else:
+        json.dump(data, sys.stdout, indent=2)
+        print()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
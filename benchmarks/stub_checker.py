@@ -0,0 +1,89 @@
+import re
+import time
+from typing import List
+
+# Words the stub reports, as LanguageTool would report misspellings
+TYPOS = {
+    "teh": "the",
+    "recieve": "receive",
+    "seperate": "separate",
+    "Fehlr": "Fehler",
+    "Satzz": "Satz",
+}
+
+_typo_pattern = re.compile(r"\b(" + "|".join(TYPOS) + r")\b")
+_space_pattern = re.compile(r"  +")
+
+
+class StubMatch:
+    def __init__(
+        self,
+        offset: int,
+        length: int,
+        rule_id: str,
+        category: str,
+        rule_issue_type: str,
+        message: str,
+        replacements: List[str],
+        text: str,
+    ) -> None:
+        self.offset = offset
+        self.error_length = length
+        self.rule_id = rule_id
+        self.category = category
+        self.rule_issue_type = rule_issue_type
+        self.message = message
+        self.replacements = replacements
+        self.context = text[max(offset - 20, 0) : offset + length + 20]
+        self.sentence = ""
+
+
+class StubChecker:
+    """
+    Deterministic stand-in for language_tool_python.LanguageTool: reports
+    known typos and repeated spaces, and can simulate the server latency.
+    """
+
+    def __init__(self, language: str = "en-US", latency_per_1k: float = 0) -> None:
+        self.language = language
+        self.latency_per_1k = latency_per_1k
+        self.requests = 0
+        self.characters = 0
+
+    def check(self, text: str) -> List[StubMatch]:
+        self.requests += 1
+        self.characters += len(text)
+        if self.latency_per_1k:
+            time.sleep(self.latency_per_1k * len(text) / 1000)
+
+        matches = [
+            StubMatch(
+                m.start(),
+                len(m.group()),
+                "MORFOLOGIK_RULE",
+                "TYPOS",
+                "misspelling",
+                "Possible spelling mistake found.",
+                [TYPOS[m.group()]],
+                text,
+            )
+            for m in _typo_pattern.finditer(text)
+        ]
+        matches.extend(
+            StubMatch(
+                m.start(),
+                len(m.group()),
+                "WHITESPACE_RULE",
+                "TYPOGRAPHY",
+                "whitespace",
+                "Possible typo: you repeated a whitespace",
+                [" "],
+                text,
+            )
+            for m in _space_pattern.finditer(text)
+        )
+        matches.sort(key=lambda match: match.offset)
+        return matches
+
+    def close(self) -> None:
+        pass
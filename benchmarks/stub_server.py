@@ -0,0 +1,128 @@
+"""
+Local stand-in for the LanguageTool HTTP server, answering /v2/check with
+the matches of StubChecker in the JSON format of LanguageTool.
+
+    python -m benchmarks.stub_server --port 8081
+
+Keeps connections alive like the real server, so LanguageToolServer can be
+tested and benchmarked without Java.
+"""
+
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from benchmarks.stub_checker import StubChecker, StubMatch
+
+VERSION = "stub"
+
+
+def match_json(match: StubMatch) -> Dict[str, Any]:
+    return {
+        "message": match.message,
+        "replacements": [{"value": value} for value in match.replacements],
+        "offset": match.offset,
+        "length": match.error_length,
+        "context": {"text": match.context, "offset": 0, "length": 0},
+        "sentence": match.sentence,
+        "rule": {
+            "id": match.rule_id,
+            "issueType": match.rule_issue_type,
+            "category": {"id": match.category},
+        },
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        fields = parse_qs(self.rfile.read(length).decode("utf-8"))
+        if self.path != "/v2/check" or "language" not in fields:
+            self.answer(400, b"Missing language")
+            return
+
+        text = fields.get("text", [""])[0]
+        self.server.requests += 1
+        matches = self.server.checker.check(text)
+        body = json.dumps(
+            {
+                "software": {"name": "LanguageTool", "version": VERSION},
+                "language": {"code": fields["language"][0]},
+                "matches": [match_json(match) for match in matches],
+            }
+        ).encode("utf-8")
+        self.answer(200, body, "application/json")
+
+    def answer(
+        self, status: int, body: bytes, content_type: str = "text/plain"
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Like a server that closed an idle connection, without telling
+        self.close_connection = not self.server.keep_alive
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], latency_per_1k: float = 0) -> None:
+        super().__init__(address, StubHandler)
+        self.checker = StubChecker(latency_per_1k=latency_per_1k)
+        self.requests = 0
+        self.connections = 0
+        self.keep_alive = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub_server(port: int = 0, latency_per_1k: float = 0) -> StubServer:
+    """
+    Serves on a background thread, port 0 picks a free port. Stop it with
+    shutdown().
+    """
+    server = StubServer(("127.0.0.1", port), latency_per_1k)
+    thread = threading.Thread(target=server.serve_forever, name="stub server")
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="seconds per 1000 characters"
+    )
+    args = parser.parse_args(argv)
+
+    server = StubServer(("127.0.0.1", args.port), args.latency)
+    print(f"Serving on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
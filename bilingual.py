@@ -0,0 +1,92 @@
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from check_engine import CheckStats, check_segments, split_segments
+from markup import OffsetMap, strip_segments
+from match_cache import MatchCache
+from match_store import MatchRecord
+from templates import SegmentPair
+from timing import span
+
+
+def text_offsets(texts: List[str]) -> List[int]:
+    """
+    Returns where every text starts when they are joined with line breaks,
+    the way FileHandler.load_file joins the targets.
+    """
+    offsets = []
+    offset = 0
+    for text in texts:
+        offsets.append(offset)
+        offset += len(text) + 1
+    return offsets
+
+
+def matches_by_pair(
+    texts: List[str], matches: List[MatchRecord]
+) -> Dict[int, List[MatchRecord]]:
+    """
+    Groups the matches of the joined texts by the index of their text, with
+    offsets relative to the start of the text.
+    """
+    starts = text_offsets(texts)
+    result: Dict[int, List[MatchRecord]] = {}
+    for record in matches:
+        index = bisect_right(starts, record.offset) - 1
+        result.setdefault(index, []).append(record.moved(record.offset - starts[index]))
+    return result
+
+
+def check_pairs(
+    pairs: List[SegmentPair],
+    checkers: List[Any],
+    source_checkers: List[Any],
+    workers: Optional[int] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+    cache: Optional[MatchCache] = None,
+    cache_config: str = "",
+    source_cache_config: str = "",
+    remove_tags: bool = False,
+    stats: Optional[CheckStats] = None,
+    source_stats: Optional[CheckStats] = None,
+) -> Tuple[List[MatchRecord], List[MatchRecord]]:
+    """
+    Checks the targets and the sources of the pairs at the same time, each on
+    their own checkers. Returns the matches of the targets and of the
+    sources, with offsets in the texts joined one per line.
+    """
+
+    def check_side(
+        texts: List[str],
+        side_checkers: List[Any],
+        config: str,
+        side_stats: Optional[CheckStats],
+    ) -> List[MatchRecord]:
+        segments = split_segments("\n".join(texts))
+        offset_map: Optional[OffsetMap] = None
+        if remove_tags:
+            segments, offset_map = strip_segments(segments)
+        return check_segments(
+            segments,
+            side_checkers,
+            workers=workers,
+            is_cancelled=is_cancelled,
+            cache=cache,
+            cache_config=config,
+            stats=side_stats,
+            offset_map=offset_map,
+        )
+
+    with span("check pairs", pairs=len(pairs)), ThreadPoolExecutor(1) as executor:
+        source = executor.submit(
+            check_side,
+            [pair.source for pair in pairs],
+            source_checkers,
+            source_cache_config,
+            source_stats,
+        )
+        target = check_side(
+            [pair.target for pair in pairs], checkers, cache_config, stats
+        )
+        return target, source.result()
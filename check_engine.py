@@ -0,0 +1,360 @@
+import os
+import queue
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sized,
+)
+
+from markup import OffsetMap
+from match_cache import MatchCache
+from match_store import MatchRecord
+from timing import span
+
+# Segments are sent to the checker in batches of about this many characters
+BATCH_SIZE = 5000
+
+# Segments are looked up, deduplicated and batched in windows of about this
+# many characters, so a long document is never normalized as a whole
+WINDOW_SIZE = 100 * BATCH_SIZE
+
+
+def default_workers() -> int:
+    return min(os.cpu_count() or 1, 8)
+
+
+class Segment(NamedTuple):
+    offset: int
+    text: str
+
+
+class CheckCancelled(Exception):
+    pass
+
+
+def split_segments(text: str) -> List[Segment]:
+    """
+    Splits the text into segments at line breaks. The loaders join segments
+    (XLIFF targets, table cells, paragraphs) with line breaks, so each line is
+    one segment. Blank lines are skipped.
+    """
+    segments = []
+    offset = 0
+    for line in text.split("\n"):
+        if line.strip():
+            segments.append(Segment(offset, line))
+        offset += len(line) + 1
+    return segments
+
+
+def iter_segments(chunks: Iterable[str]) -> Iterator[Segment]:
+    """
+    Like split_segments, for text that comes in chunks. A line may be split
+    between chunks, even between more than two.
+    """
+    offset = 0
+    # Pieces of the line that is not finished yet
+    rest: List[str] = []
+    for chunk in chunks:
+        lines = chunk.split("\n")
+        if len(lines) == 1:
+            rest.append(chunk)
+            continue
+        if rest:
+            rest.append(lines[0])
+            lines[0] = "".join(rest)
+        rest = [lines.pop()]
+        for line in lines:
+            if line.strip():
+                yield Segment(offset, line)
+            offset += len(line) + 1
+    line = "".join(rest)
+    if line.strip():
+        yield Segment(offset, line)
+
+
+def normalize_segment(segment: Segment) -> Segment:
+    """
+    Strips surrounding whitespace, so the same segment with different
+    indentation is cached once. The offset moves along, so matches still point
+    to the right place.
+    """
+    text = segment.text.lstrip()
+    lead = len(segment.text) - len(text)
+    return Segment(segment.offset + lead, text.rstrip())
+
+
+def make_batches(
+    segments: List[Segment], batch_size: int = BATCH_SIZE
+) -> List[List[Segment]]:
+    batches: List[List[Segment]] = []
+    batch: List[Segment] = []
+    size = 0
+    for segment in segments:
+        if batch and size + len(segment.text) > batch_size:
+            batches.append(batch)
+            batch = []
+            size = 0
+        batch.append(segment)
+        size += len(segment.text) + 1
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def check_batch(checker: Any, batch: List[Segment]) -> List[List[MatchRecord]]:
+    """
+    Checks a batch of segments in one request. Returns the matches of each
+    segment, moved from batch-local to document offsets.
+    """
+    starts = []
+    position = 0
+    for segment in batch:
+        starts.append(position)
+        position += len(segment.text) + 1
+
+    segment_matches: List[List[MatchRecord]] = [[] for _ in batch]
+    for match in checker.check("\n".join(segment.text for segment in batch)):
+        index = bisect_right(starts, match.offset) - 1
+        offset = batch[index].offset + match.offset - starts[index]
+        segment_matches[index].append(MatchRecord.from_match(match, offset))
+    return segment_matches
+
+
+class CheckStats:
+    """
+    Counts how many segments a check had and how many of them did not need
+    a request to the checker: cached counts the texts read from the cache,
+    repeated the segments whose text came before. skipped counts segments in
+    languages without a checker, which are not part of segments.
+    """
+
+    def __init__(self) -> None:
+        self.segments = 0
+        self.cached = 0
+        self.repeated = 0
+        self.checked = 0
+        self.batches = 0
+        self.skipped = 0
+
+    @property
+    def saved(self) -> int:
+        return self.cached + self.repeated
+
+    def add(self, other: "CheckStats") -> None:
+        self.segments += other.segments
+        self.cached += other.cached
+        self.repeated += other.repeated
+        self.checked += other.checked
+        self.batches += other.batches
+        self.skipped += other.skipped
+
+
+def iter_windows(
+    segments: Iterable[Segment], window_size: int = WINDOW_SIZE
+) -> Iterator[List[Segment]]:
+    """
+    Normalizes the segments and yields them in lists of about window_size
+    characters.
+    """
+    window: List[Segment] = []
+    size = 0
+    for segment in segments:
+        segment = normalize_segment(segment)
+        window.append(segment)
+        size += len(segment.text) + 1
+        if size >= window_size:
+            yield window
+            window = []
+            size = 0
+    if window:
+        yield window
+
+
+def check_segments(
+    segments: Iterable[Segment],
+    checkers: List[Any],
+    workers: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+    batch_size: int = BATCH_SIZE,
+    cache: Optional[MatchCache] = None,
+    cache_config: str = "",
+    on_batch: Optional[Callable[[List[Segment], List[MatchRecord]], None]] = None,
+    stats: Optional[CheckStats] = None,
+    offset_map: Optional[OffsetMap] = None,
+    window_size: int = WINDOW_SIZE,
+) -> List[MatchRecord]:
+    """
+    Checks the segments in batches on several threads, spread over the given
+    checkers. A checker server handles concurrent requests, so there can be
+    more threads than checkers. Segments found in the cache are not checked
+    again, and repeated segments are checked once, their matches are copied
+    to the other occurrences. Returns the matches sorted by document offset.
+
+    The segments are read in windows of about window_size characters, so an
+    iterator of segments is never in memory as a whole. Only the texts seen so
+    far and their matches are kept between windows.
+
+    on_batch is called for every window with the segments and matches of the
+    segments whose text is known, then of every batch in document order, as
+    soon as they are known. on_progress is called with the number of segments
+    done and the number of segments, which is 0 if segments is an iterator.
+    stats is filled with the number of segments that were cached, repeated and
+    checked. If the segments were stripped of markup, offset_map moves the
+    matches back to the original text before they are passed on.
+
+    Raises CheckCancelled if is_cancelled returns True before all batches ran.
+    """
+    matches: List[MatchRecord] = []
+    stats = stats or CheckStats()
+    total = len(segments) if isinstance(segments, Sized) else 0
+    done = 0
+    if on_progress:
+        on_progress(0, total)
+
+    # Matches of the texts checked or read from the cache so far, relative to
+    # the segment start
+    seen: Dict[str, List[MatchRecord]] = {}
+
+    workers = workers or default_workers()
+    # Spread the threads evenly over the checkers
+    free_checkers: "queue.Queue[Any]" = queue.Queue()
+    for i in range(workers):
+        free_checkers.put(checkers[i % len(checkers)])
+
+    def run(batch: List[Segment]) -> List[List[MatchRecord]]:
+        if is_cancelled and is_cancelled():
+            raise CheckCancelled()
+        checker = free_checkers.get()
+        try:
+            with span("check batch", segments=len(batch)):
+                return check_batch(checker, batch)
+        finally:
+            free_checkers.put(checker)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for window in iter_windows(segments, window_size):
+            stats.segments += len(window)
+
+            cached: Dict[str, List[MatchRecord]] = {}
+            if cache is not None:
+                with span("cache lookup", segments=len(window)) as details:
+                    cached = cache.get_many(
+                        cache_config,
+                        {
+                            segment.text
+                            for segment in window
+                            if segment.text not in seen
+                        },
+                    )
+                    details["hits"] = len(cached)
+                seen.update(cached)
+
+            # Only the first occurrence of a new text is checked
+            hits: List[Segment] = []
+            hit_matches: List[MatchRecord] = []
+            unique: List[Segment] = []
+            repeats: List[Segment] = []
+            unchecked = set()
+            for segment in window:
+                records = seen.get(segment.text)
+                if records is not None:
+                    if cached.pop(segment.text, None) is not None:
+                        stats.cached += 1
+                    else:
+                        stats.repeated += 1
+                    hits.append(segment)
+                    for record in records:
+                        hit_matches.append(record.moved(segment.offset + record.offset))
+                elif segment.text in unchecked:
+                    repeats.append(segment)
+                else:
+                    unchecked.add(segment.text)
+                    unique.append(segment)
+            stats.repeated += len(repeats)
+            stats.checked += len(unique)
+
+            if offset_map is not None:
+                hit_matches = offset_map.map_records(hit_matches)
+            matches.extend(hit_matches)
+            if hits:
+                done += len(hits)
+                if on_batch:
+                    on_batch(hits, hit_matches)
+                if on_progress:
+                    on_progress(done, total)
+
+            batches = make_batches(unique, batch_size)
+            stats.batches += len(batches)
+            if not batches:
+                continue
+
+            futures = [executor.submit(run, batch) for batch in batches]
+            next_repeat = 0
+            try:
+                for index, (batch, future) in enumerate(zip(batches, futures), 1):
+                    segment_matches = future.result()
+                    batch_matches = [
+                        record for records in segment_matches for record in records
+                    ]
+                    entries = _cache_entries(batch, segment_matches)
+                    seen.update(entries)
+                    if cache is not None:
+                        cache.put_many(cache_config, entries)
+
+                    # Repeats before the next batch have all been checked, so
+                    # the batches stay in document order
+                    next_start = (
+                        batches[index][0].offset if index < len(batches) else None
+                    )
+                    batch_segments = list(batch)
+                    while next_repeat < len(repeats) and (
+                        next_start is None or repeats[next_repeat].offset < next_start
+                    ):
+                        repeat = repeats[next_repeat]
+                        next_repeat += 1
+                        batch_segments.append(repeat)
+                        for record in seen[repeat.text]:
+                            batch_matches.append(
+                                record.moved(repeat.offset + record.offset)
+                            )
+
+                    if offset_map is not None:
+                        batch_matches = offset_map.map_records(batch_matches)
+                    matches.extend(batch_matches)
+                    done += len(batch_segments)
+                    if on_batch:
+                        batch_segments.sort()
+                        batch_matches.sort(key=lambda match: match.offset)
+                        on_batch(batch_segments, batch_matches)
+                    if on_progress:
+                        on_progress(done, total)
+            except BaseException:
+                # A cancelled check or a failing checker stops the queued
+                # batches, instead of sending them all before raising
+                for future in futures:
+                    future.cancel()
+                raise
+
+    matches.sort(key=lambda match: match.offset)
+    return matches
+
+
+def _cache_entries(
+    batch: List[Segment], segment_matches: List[List[MatchRecord]]
+) -> Dict[str, List[MatchRecord]]:
+    return {
+        segment.text: [
+            record.moved(record.offset - segment.offset) for record in records
+        ]
+        for segment, records in zip(batch, segment_matches)
+    }
@@ -0,0 +1,93 @@
+from typing import List, Optional
+
+from PySide6.QtCore import QThread, Signal
+
+from check_engine import CheckCancelled, CheckStats, Segment
+from checker_pool import CheckerPool
+from language_id import check_languages, route_segments
+from markup import OffsetMap, strip_segments
+from match_cache import MatchCache
+from match_store import MatchRecord
+from timing import span
+
+
+class CheckWorker(QThread):
+    progress = Signal(int, int)
+    batchChecked = Signal(int, list, list)
+    checkFinished = Signal(int, list)
+    checkFailed = Signal(int, str)
+
+    def __init__(
+        self,
+        checker_pool: CheckerPool,
+        language: str,
+        segments: List[Segment],
+        generation: int,
+        checker_count: int = 1,
+        workers: int = 0,
+        match_cache: Optional[MatchCache] = None,
+        remove_tags: bool = False,
+        languages: Optional[List[str]] = None,
+    ):
+        super().__init__()
+        self.checker_pool = checker_pool
+        self.language = language
+        self.segments = segments
+        self.generation = generation
+        self.checker_count = checker_count
+        self.workers = workers
+        self.match_cache = match_cache
+        self.remove_tags = remove_tags
+        # With languages, every segment goes to the checker of its language
+        self.languages = languages
+        self.cancelled = False
+        self.stats = CheckStats()
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def emitBatch(self, segments: List[Segment], matches: List[MatchRecord]) -> None:
+        if not self.cancelled:
+            self.batchChecked.emit(self.generation, segments, matches)
+
+    def run(self):
+        matches = []
+        try:
+            # Nothing to check if all paragraphs are known from the last check
+            if self.segments:
+                self.progress.emit(0, 0)
+                segments = self.segments
+                offset_map: Optional[OffsetMap] = None
+                if self.remove_tags:
+                    with span("remove tags", segments=len(segments)):
+                        segments, offset_map = strip_segments(segments)
+                groups = {self.language: segments}
+                if self.languages:
+                    with span("identify languages", segments=len(segments)):
+                        groups, skipped = route_segments(
+                            segments, self.language, self.languages
+                        )
+                    self.stats.skipped = len(skipped)
+                with span("check", segments=len(segments)):
+                    matches = check_languages(
+                        groups,
+                        lambda language: self.checker_pool.checkers(
+                            language, self.checker_count
+                        ),
+                        workers=self.workers,
+                        on_progress=self.progress.emit,
+                        is_cancelled=lambda: self.cancelled,
+                        cache=self.match_cache,
+                        on_batch=self.emitBatch,
+                        stats=self.stats,
+                        offset_map=offset_map,
+                    )
+        except CheckCancelled:
+            return
+        except Exception as e:
+            if not self.cancelled:
+                self.checkFailed.emit(self.generation, str(e))
+            return
+
+        if not self.cancelled:
+            self.checkFinished.emit(self.generation, matches)
@@ -0,0 +1,236 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from timing import span
+
+logger = logging.getLogger(__name__)
+
+
+def create_language_tool(language: str) -> Any:
+    import language_tool_python  # type: ignore
+
+    return language_tool_python.LanguageTool(language)
+
+
+class _PoolEntry:
+    def __init__(self, language: str) -> None:
+        self.language = language
+        self.checker: Any = None
+        self.error: Optional[BaseException] = None
+        self.ready = threading.Event()
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+
+class CheckerPool:
+    """
+    Keeps warm LanguageTool instances keyed by language code, so switching
+    languages only pays the server start-up once per language. A language can
+    have several instances to check segments in parallel, the additional ones
+    are keyed "<language>#<n>".
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float = 600,
+        max_instances: int = 3,
+        memory_limit_mb: int = 0,
+        factory: Optional[Callable[[str], Any]] = None,
+    ) -> None:
+        self.idle_timeout = idle_timeout
+        self.max_instances = max_instances
+        self.memory_limit_mb = memory_limit_mb
+        self.factory = factory or create_language_tool
+
+        self._entries: Dict[str, _PoolEntry] = {}
+        self._lock = threading.Lock()
+
+    def languages(self) -> List[str]:
+        with self._lock:
+            return list({entry.language for entry in self._entries.values()})
+
+    def is_ready(self, language: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(language)
+        return entry is not None and entry.ready.is_set() and entry.error is None
+
+    def warm_up(self, language: str, count: int = 1) -> None:
+        """
+        Starts count checkers for a language in the background.
+        """
+        for key in self._keys(language, count):
+            with self._lock:
+                if key in self._entries:
+                    continue
+
+            thread = threading.Thread(
+                target=self._warm_up, args=(key,), name=f"warm-up {key}"
+            )
+            thread.daemon = True
+            thread.start()
+
+    def _warm_up(self, key: str) -> None:
+        try:
+            self._release(self._acquire(key))
+        except Exception as e:
+            # The next request for this checker tries again and raises the error
+            logger.warning("Starting checker %s failed: %s", key, e)
+
+    def _keys(self, language: str, count: int) -> List[str]:
+        return [language] + [f"{language}#{i}" for i in range(1, count)]
+
+    @contextmanager
+    def checker(self, language: str) -> Iterator[Any]:
+        """
+        Yields a warm checker for the language, creating it on first use.
+        The checker is not evicted while it is in use.
+        """
+        entry = self._acquire(language)
+        try:
+            yield entry.checker
+        finally:
+            self._release(entry)
+
+    @contextmanager
+    def checkers(self, language: str, count: int) -> Iterator[List[Any]]:
+        """
+        Yields count warm checkers for the language. Missing ones are started
+        at the same time.
+        """
+        keys = self._keys(language, count)
+        self.warm_up(language, count)
+
+        entries: List[_PoolEntry] = []
+        try:
+            for key in keys:
+                entries.append(self._acquire(key))
+            yield [entry.checker for entry in entries]
+        finally:
+            for entry in entries:
+                self._release(entry)
+
+    def _acquire(self, key: str) -> _PoolEntry:
+        with self._lock:
+            entry = self._entries.get(key)
+            create = entry is None
+            if entry is None:
+                entry = _PoolEntry(key.split("#")[0])
+                self._entries[key] = entry
+            entry.in_use += 1
+
+        if create:
+            try:
+                with span("create checker", language=entry.language):
+                    entry.checker = self.factory(entry.language)
+            except BaseException as e:
+                entry.error = e
+            entry.ready.set()
+            self._enforce_limits(keep=key)
+        else:
+            entry.ready.wait()
+
+        if entry.error is not None:
+            with self._lock:
+                entry.in_use -= 1
+                # Drop the failed entry so the next request tries again
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            raise entry.error
+
+        return entry
+
+    def _release(self, entry: _PoolEntry) -> None:
+        with self._lock:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+
+    def evict_idle(self) -> None:
+        """
+        Closes checkers that have not been used for longer than the idle timeout.
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                key
+                for key, entry in self._entries.items()
+                if entry.ready.is_set()
+                and entry.in_use == 0
+                and now - entry.last_used > self.idle_timeout
+            ]
+        for key in expired:
+            self._evict(key)
+
+    def _enforce_limits(self, keep: str) -> None:
+        while True:
+            with self._lock:
+                over_count = len(self._entries) > self.max_instances > 0
+            over_memory = (
+                self.memory_limit_mb > 0
+                and self.memory_usage_mb() > self.memory_limit_mb
+            )
+            if not (over_count or over_memory):
+                return
+
+            with self._lock:
+                idle = [
+                    (entry.last_used, key)
+                    for key, entry in self._entries.items()
+                    if key != keep and entry.ready.is_set() and entry.in_use == 0
+                ]
+            if not idle:
+                return
+            self._evict(min(idle)[1])
+
+    def _evict(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.in_use > 0:
+                return
+            del self._entries[key]
+        self._close(entry)
+
+    def memory_usage_mb(self) -> float:
+        """
+        Returns the resident memory of all checker server processes, or 0 if
+        it cannot be determined (psutil is optional).
+        """
+        try:
+            import psutil  # type: ignore
+        except ImportError:
+            return 0
+
+        total = 0
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            server = getattr(entry.checker, "_server", None)
+            pid = getattr(server, "pid", None)
+            if pid is None:
+                continue
+            try:
+                total += psutil.Process(pid).memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+
+    def _close(self, entry: _PoolEntry) -> None:
+        if entry.checker is None:
+            return
+        try:
+            entry.checker.close()
+        except Exception as e:
+            logger.debug("Closing checker %s failed: %s", entry.language, e)
+
+    def shutdown(self) -> None:
+        """
+        Closes all checkers. Checkers still starting up are closed once ready.
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            entry.ready.wait(timeout=30)
+            self._close(entry)
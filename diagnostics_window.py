@@ -0,0 +1,135 @@
+from typing import Dict, List, Optional
+
+from PySide6.QtWidgets import (
+    QDialog,
+    QFileDialog,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from lt_server import LanguageToolServer
+from timing import Span, Timings, timings
+
+# The table shows the most recent spans only
+MAX_ROWS = 500
+
+
+class DiagnosticsWindow(QDialog):
+    def __init__(
+        self,
+        parent: Optional[QWidget] = None,
+        recorder: Timings = timings,
+        server: Optional[LanguageToolServer] = None,
+    ) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.recorder = recorder
+        self.server = server
+        self.layout = QVBoxLayout()
+
+        self.server_label = QLabel()
+        self.layout.addWidget(self.server_label)
+
+        self.layout.addWidget(QLabel("Phases:"))
+        self.summary_table = QTableWidget(0, 4)
+        self.summary_table.setHorizontalHeaderLabels(
+            ["Phase", "Count", "Last (ms)", "Total (ms)"]
+        )
+        self.summary_table.verticalHeader().hide()
+        self.layout.addWidget(self.summary_table)
+
+        self.layout.addWidget(QLabel("Recent spans:"))
+        self.span_table = QTableWidget(0, 4)
+        self.span_table.setHorizontalHeaderLabels(
+            ["Phase", "Thread", "Start (s)", "Duration (ms)"]
+        )
+        self.span_table.verticalHeader().hide()
+        self.span_table.horizontalHeader().setStretchLastSection(True)
+        self.layout.addWidget(self.span_table)
+
+        button_layout = QHBoxLayout()
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        button_layout.addWidget(refresh_button)
+
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clear)
+        button_layout.addWidget(clear_button)
+
+        export_button = QPushButton("Export Trace...")
+        export_button.clicked.connect(self.exportTrace)
+        button_layout.addWidget(export_button)
+        self.layout.addLayout(button_layout)
+
+        self.setLayout(self.layout)
+        self.setMinimumSize(600, 500)
+        self.refresh()
+
+    def refresh(self) -> None:
+        server = self.server
+        if server is None:
+            self.server_label.setText("LanguageTool server: not used")
+        else:
+            version = f" {server.version}" if server.version else ""
+            self.server_label.setText(
+                f"LanguageTool server{version} at {server.url}: "
+                f"{server.requests} requests, {server.restarts} restarts"
+            )
+
+        spans = self.recorder.spans()
+        self.fillSummary(spans)
+
+        recent = spans[-MAX_ROWS:][::-1]
+        self.span_table.setRowCount(len(recent))
+        for row, span in enumerate(recent):
+            name = span.name
+            if span.args:
+                details = ", ".join(
+                    f"{key}={value}" for key, value in span.args.items()
+                )
+                name += f" ({details})"
+            self.setRow(
+                self.span_table,
+                row,
+                [name, span.thread, f"{span.start:.3f}", f"{span.duration * 1000:.1f}"],
+            )
+        self.span_table.resizeColumnsToContents()
+
+    def fillSummary(self, spans: List[Span]) -> None:
+        phases: Dict[str, List[float]] = {}
+        for span in spans:
+            phases.setdefault(span.name, []).append(span.duration)
+
+        self.summary_table.setRowCount(len(phases))
+        for row, (name, durations) in enumerate(phases.items()):
+            self.setRow(
+                self.summary_table,
+                row,
+                [
+                    name,
+                    str(len(durations)),
+                    f"{durations[-1] * 1000:.1f}",
+                    f"{sum(durations) * 1000:.1f}",
+                ],
+            )
+        self.summary_table.resizeColumnsToContents()
+
+    def setRow(self, table: QTableWidget, row: int, values: List[str]) -> None:
+        for column, value in enumerate(values):
+            table.setItem(row, column, QTableWidgetItem(value))
+
+    def clear(self) -> None:
+        self.recorder.clear()
+        self.refresh()
+
+    def exportTrace(self) -> None:
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Export Trace", "trace.json", "Chrome trace (*.json)"
+        )
+        if file_name:
+            self.recorder.export(file_name)
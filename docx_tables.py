@@ -0,0 +1,130 @@
+import xml.etree.ElementTree as ET
+import zipfile
+from typing import IO, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def _int_val(parent: Optional[ET.Element], tag: str, default: int) -> int:
+    if parent is None:
+        return default
+    element = parent.find(W + tag)
+    if element is None:
+        return default
+    try:
+        return int(element.get(W + "val", default))
+    except ValueError:
+        return default
+
+
+def run_text(run: ET.Element) -> str:
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == W + "t":
+            parts.append(child.text or "")
+        elif tag == W + "tab" or tag == W + "ptab":
+            parts.append("\t")
+        elif tag == W + "br":
+            # Page and column breaks have no text
+            if child.get(W + "type", "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag == W + "cr":
+            parts.append("\n")
+        elif tag == W + "noBreakHyphen":
+            parts.append("-")
+    return "".join(parts)
+
+
+def paragraph_text(paragraph: ET.Element) -> str:
+    parts = []
+    for child in paragraph:
+        if child.tag == W + "r":
+            parts.append(run_text(child))
+        elif child.tag == W + "hyperlink":
+            for run in child.findall(W + "r"):
+                parts.append(run_text(run))
+    return "".join(parts)
+
+
+def cell_text(cell: ET.Element) -> str:
+    # Paragraphs of nested tables are not part of the cell text
+    return "\n".join(paragraph_text(p) for p in cell.findall(W + "p"))
+
+
+def row_cells(row: ET.Element, above: Dict[int, str]) -> List[str]:
+    """
+    Returns the text of every grid column of a row, like python-docx's
+    row.cells: a cell spanning several columns is repeated and a vertically
+    merged cell has the text of the cell it continues. Columns skipped with
+    gridBefore and gridAfter have no cell. above holds the texts of the
+    previous row by grid column and is updated.
+    """
+    properties = row.find(W + "trPr")
+    # Grid column of the next cell
+    column = _int_val(properties, "gridBefore", 0)
+    cells: List[str] = []
+    texts: Dict[int, str] = {}
+
+    for cell in row.findall(W + "tc"):
+        cell_properties = cell.find(W + "tcPr")
+        span = max(_int_val(cell_properties, "gridSpan", 1), 1)
+
+        v_merge = None
+        if cell_properties is not None:
+            v_merge = cell_properties.find(W + "vMerge")
+        if v_merge is not None and v_merge.get(W + "val", "continue") == "continue":
+            text = above.get(column, "")
+        else:
+            text = cell_text(cell)
+        cells.extend([text] * span)
+        texts[column] = text
+        column += span
+
+    above.clear()
+    above.update(texts)
+    return cells
+
+
+def iter_table_rows(
+    source: Union[str, IO[bytes]], tables: Optional[Set[int]] = None
+) -> Iterator[Tuple[int, List[str]]]:
+    """
+    Streams word/document.xml of a DOCX file and yields (table index, cells)
+    for every row of the top-level tables, or only of the given tables.
+    Tables are counted like python-docx's document.tables.
+    """
+    with zipfile.ZipFile(source) as archive, archive.open("word/document.xml") as xml:
+        stack: List[ET.Element] = []
+        table_index = -1
+        above: Dict[int, str] = {}
+
+        for event, element in ET.iterparse(xml, events=("start", "end")):
+            if event == "start":
+                if element.tag == W + "tbl" and stack and stack[-1].tag == W + "body":
+                    table_index += 1
+                    above = {}
+                    # Tables after the last wanted one do not need to be read
+                    if tables is not None and table_index > max(tables, default=-1):
+                        return
+                stack.append(element)
+                continue
+
+            stack.pop()
+            if not stack:
+                continue
+            parent = stack[-1]
+
+            if (
+                element.tag == W + "tr"
+                and parent.tag == W + "tbl"
+                and len(stack) > 1
+                and stack[-2].tag == W + "body"
+            ):
+                if tables is None or table_index in tables:
+                    yield table_index, row_cells(element, above)
+                parent.remove(element)
+            elif parent.tag == W + "body":
+                # Finished top-level paragraphs and tables are not needed anymore
+                parent.remove(element)
+
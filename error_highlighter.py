@@ -0,0 +1,196 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from PySide6.QtCore import QObject, QPoint, QTimer
+from PySide6.QtGui import (
+    QColor,
+    QTextBlock,
+    QTextCharFormat,
+    QTextDocument,
+    QTextLayout,
+)
+from PySide6.QtWidgets import QTextEdit
+
+from match_store import MatchRecord
+
+# Blocks that stay highlighted after they scrolled out of view
+MAX_HIGHLIGHTED_BLOCKS = 1000
+
+# Blocks above and below the viewport that are highlighted in advance
+VIEWPORT_MARGIN = 50
+
+
+class ErrorHighlighter(QObject):
+    """
+    Underlines errors in a QTextEdit, but only in the blocks near the
+    viewport. The errors of a block are looked up by its text, relative to
+    the block start, so they stay right when text above is edited.
+
+    Like QSyntaxHighlighter, the formats are set on the block layouts instead
+    of the document: they are not undo steps, do not change the document
+    revision, and the least recently visible blocks are cleared again once
+    more than max_blocks are highlighted.
+    """
+
+    def __init__(
+        self,
+        text_edit: QTextEdit,
+        block_errors: Callable[[str], Optional[List[MatchRecord]]],
+        max_blocks: int = MAX_HIGHLIGHTED_BLOCKS,
+    ) -> None:
+        super().__init__(text_edit)
+        self.text_edit = text_edit
+        self.block_errors = block_errors
+        self.max_blocks = max_blocks
+        self.highlighting = False
+
+        # Numbers of the highlighted blocks, least recently visible first
+        self._blocks: "OrderedDict[int, None]" = OrderedDict()
+        self._formats: Dict[str, QTextCharFormat] = {}
+        self._document: Optional[QTextDocument] = None
+        self._block_count = 0
+
+        # Scrolling emits many signals, the viewport is updated once for them
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.highlightViewport)
+
+        scroll_bar = text_edit.verticalScrollBar()
+        scroll_bar.valueChanged.connect(self.scheduleUpdate)
+        scroll_bar.rangeChanged.connect(self.scheduleUpdate)
+        self.setDocument(text_edit.document())
+
+    def setDocument(self, document: QTextDocument) -> None:
+        if self._document is not None:
+            self._document.contentsChange.disconnect(self.documentChanged)
+        self._document = document
+        self._block_count = document.blockCount()
+        self._blocks.clear()
+        document.contentsChange.connect(self.documentChanged)
+        self.scheduleUpdate()
+
+    def highlightedBlocks(self) -> int:
+        return len(self._blocks)
+
+    def scheduleUpdate(self) -> None:
+        self._timer.start()
+
+    def rehighlight(self) -> None:
+        """
+        Highlights the highlighted blocks again, for example after the error
+        colors changed.
+        """
+        self._formats.clear()
+        self.refreshBlocks(list(self._blocks))
+
+    def refreshBlocks(self, block_numbers: Iterable[int]) -> None:
+        """
+        Highlights the given blocks again if they are highlighted, blocks that
+        come into view later are highlighted then.
+        """
+        document = self.text_edit.document()
+        for number in block_numbers:
+            if number in self._blocks:
+                self.highlightBlock(document.findBlockByNumber(number))
+        self.scheduleUpdate()
+
+    def visibleBlocks(self) -> range:
+        viewport = self.text_edit.viewport()
+        top = self.text_edit.cursorForPosition(QPoint(0, 0)).blockNumber()
+        bottom = self.text_edit.cursorForPosition(
+            QPoint(viewport.width() - 1, viewport.height() - 1)
+        ).blockNumber()
+        last = self.text_edit.document().blockCount() - 1
+        return range(
+            max(top - VIEWPORT_MARGIN, 0), min(bottom + VIEWPORT_MARGIN, last) + 1
+        )
+
+    def highlightViewport(self) -> None:
+        document = self.text_edit.document()
+        for number in self.visibleBlocks():
+            if number in self._blocks:
+                self._blocks.move_to_end(number)
+            else:
+                self._blocks[number] = None
+                self.highlightBlock(document.findBlockByNumber(number))
+
+        while len(self._blocks) > self.max_blocks:
+            number, _ = self._blocks.popitem(last=False)
+            block = document.findBlockByNumber(number)
+            if block.isValid():
+                self.setBlockFormats(block, [])
+
+    def highlightBlock(self, block: QTextBlock) -> None:
+        if not block.isValid():
+            return
+        ranges = []
+        for record in self.block_errors(block.text()) or []:
+            format_range = QTextLayout.FormatRange()
+            format_range.start = record.offset
+            format_range.length = record.length
+            format_range.format = self.errorFormat(record)
+            ranges.append(format_range)
+        self.setBlockFormats(block, ranges)
+
+    def setBlockFormats(
+        self, block: QTextBlock, ranges: List[QTextLayout.FormatRange]
+    ) -> None:
+        layout = block.layout()
+        if not ranges and not layout.formats():
+            return
+        self.highlighting = True
+        try:
+            layout.setFormats(ranges)
+            # Lays out and repaints the block with the new formats
+            block.document().markContentsDirty(block.position(), block.length())
+        finally:
+            self.highlighting = False
+
+    def errorFormat(self, record: MatchRecord) -> QTextCharFormat:
+        # Errors of the same type share one format
+        format = self._formats.get(record.issue_type)
+        if format is not None:
+            return format
+
+        from pyLanguageTool import error_type_color_map
+
+        format = QTextCharFormat()
+        format.setFontUnderline(True)
+        underline_color = error_type_color_map.get(
+            record.issue_type, QColor(0, 0, 0, 128)  # semi-transparent black
+        )
+        format.setUnderlineColor(underline_color)
+        format.setUnderlineStyle(QTextCharFormat.UnderlineStyle.SpellCheckUnderline)
+        # Tooltips and clicks look up the error in the match store by position
+        format.setBackground(QColor(underline_color).lighter(190))
+        self._formats[record.issue_type] = format
+        return format
+
+    def documentChanged(self, position: int, removed: int, added: int) -> None:
+        if self.highlighting:
+            return
+        document = self.text_edit.document()
+        first = document.findBlock(position).blockNumber()
+        last = document.findBlock(position + added).blockNumber()
+
+        # Block numbers after the edit move when blocks are added or removed
+        delta = document.blockCount() - self._block_count
+        self._block_count = document.blockCount()
+        if delta:
+            blocks: "OrderedDict[int, None]" = OrderedDict()
+            for number in self._blocks:
+                if number <= first:
+                    blocks[number] = None
+                elif number - first > -delta:
+                    blocks[number + delta] = None
+                else:
+                    # Merged into the first block
+                    blocks[first] = None
+            self._blocks = blocks
+
+        # Edited blocks lose their errors until they are checked again
+        for number in list(self._blocks):
+            if first <= number <= last:
+                self.highlightBlock(document.findBlockByNumber(number))
+        self.scheduleUpdate()
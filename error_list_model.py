@@ -0,0 +1,184 @@
+from bisect import bisect_left
+from typing import Any, Callable, List, Optional
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtGui import QColor
+
+from match_store import MatchRecord, MatchStore
+
+# Rows are added to the view in steps of this size while scrolling
+FETCH_SIZE = 200
+
+COLUMNS: List[tuple[str, Callable[[MatchRecord], Any]]] = [
+    ("Offset", lambda record: record.offset),
+    ("Type", lambda record: record.issue_type),
+    ("Category", lambda record: record.category),
+    ("Rule", lambda record: record.rule_id),
+    ("Message", lambda record: record.message),
+    ("Replacements", lambda record: ", ".join(record.replacements[:5])),
+    ("Context", lambda record: record.context),
+]
+
+
+class ErrorListModel(QAbstractTableModel):
+    """
+    Table of the matches in a MatchStore. Filtering and sorting work on
+    indices into the store, rows are handed to the view lazily.
+    """
+
+    def __init__(self, parent: Optional[Any] = None) -> None:
+        super().__init__(parent)
+        self.match_store = MatchStore()
+        self.category = ""
+        self.text_filter = ""
+        self.sort_column = 0
+        self.sort_order = Qt.SortOrder.AscendingOrder
+
+        self._rows: List[int] = []
+        self._loaded = 0
+
+    def setMatchStore(self, match_store: MatchStore) -> None:
+        self.match_store = match_store
+        self.refresh()
+
+    def setFilter(self, category: str, text_filter: str) -> None:
+        self.category = category
+        self.text_filter = text_filter.lower()
+        self.refresh()
+
+    def refresh(self) -> None:
+        self.beginResetModel()
+        rows = [
+            index
+            for index, record in enumerate(self.match_store)
+            if self.accepts(record)
+        ]
+        if self.sort_column != 0:
+            key = COLUMNS[self.sort_column][1]
+            rows.sort(key=lambda index: key(self.match_store[index]))
+        if self.sort_order == Qt.SortOrder.DescendingOrder:
+            rows.reverse()
+        self._rows = rows
+        self._loaded = min(FETCH_SIZE, len(rows))
+        self.endResetModel()
+
+    def recordsAdded(self, first: int) -> None:
+        """
+        Shows the matches that were appended to the store from index first
+        on, without resetting the rows that are already shown.
+        """
+        if self.sort_column != 0 or self.sort_order != Qt.SortOrder.AscendingOrder:
+            self.refresh()
+            return
+
+        self._rows.extend(
+            index
+            for index in range(first, len(self.match_store))
+            if self.accepts(self.match_store[index])
+        )
+        # Fill the first page right away, the rest is fetched while scrolling
+        loaded = max(self._loaded, min(FETCH_SIZE, len(self._rows)))
+        if loaded > self._loaded:
+            self.beginInsertRows(QModelIndex(), self._loaded, loaded - 1)
+            self._loaded = loaded
+            self.endInsertRows()
+
+    def offsetsChanged(self) -> None:
+        """
+        Shows the new offsets of matches that were moved in the store without
+        changing their indices.
+        """
+        if self._loaded:
+            self.dataChanged.emit(self.index(0, 0), self.index(self._loaded - 1, 0))
+
+    def accepts(self, record: MatchRecord) -> bool:
+        if self.category and record.category != self.category:
+            return False
+        if self.text_filter:
+            return (
+                self.text_filter in record.rule_id.lower()
+                or self.text_filter in record.message.lower()
+            )
+        return True
+
+    def record(self, index: QModelIndex) -> Optional[MatchRecord]:
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        return self.match_store[self._rows[index.row()]]
+
+    def rowOf(self, offset: int) -> int:
+        """
+        Returns the row of the first shown match at offset, loading rows up to
+        it, or -1.
+        """
+        first = self.match_store.index_of(offset)
+        last = self.match_store.index_of(offset + 1)
+        if first == last:
+            return -1
+
+        if self.sort_column == 0 and self.sort_order == Qt.SortOrder.AscendingOrder:
+            # The rows are in store order
+            row = bisect_left(self._rows, first)
+            if row == len(self._rows) or self._rows[row] >= last:
+                return -1
+        else:
+            row = next(
+                (row for row, index in enumerate(self._rows) if first <= index < last),
+                -1,
+            )
+            if row < 0:
+                return -1
+
+        if row >= self._loaded:
+            self.beginInsertRows(QModelIndex(), self._loaded, row)
+            self._loaded = row + 1
+            self.endInsertRows()
+        return row
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self._loaded < len(self._rows)
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        count = min(FETCH_SIZE, len(self._rows) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def headerData(
+        self, section: int, orientation: Qt.Orientation, role: int = 0
+    ) -> Any:
+        if (
+            role == Qt.ItemDataRole.DisplayRole
+            and orientation == Qt.Orientation.Horizontal
+        ):
+            return COLUMNS[section][0]
+        return None
+
+    def data(self, index: QModelIndex, role: int = 0) -> Any:
+        record = self.record(index)
+        if record is None:
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return COLUMNS[index.column()][1](record)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return record.tooltip()
+        if role == Qt.ItemDataRole.BackgroundRole:
+            from pyLanguageTool import error_type_color_map
+
+            color = error_type_color_map.get(record.issue_type, Qt.GlobalColor.yellow)
+            return QColor(color).lighter(190)
+        return None
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.refresh()
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import time
+import zlib
+from typing import Optional, Tuple
+
+from sqlite_cache import SqliteCache, open_sqlite_cache
+
+# Changes whenever the loaders extract text differently
+EXTRACTION_FORMAT = 1
+
+
+def file_signature(file_name: str) -> Tuple[int, int]:
+    stat = os.stat(file_name)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def file_hash(file_name: str) -> str:
+    digest = hashlib.sha1()
+    with open(file_name, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache(SqliteCache):
+    """
+    Persistent cache of the text extracted from files, compressed with zlib
+    and keyed by the file path and a variant (the template for table
+    formats). An entry is used if the file still has the same size and
+    modification time, or the same content if only the time changed. The
+    least recently used entries are removed when the compressed texts take
+    more than max_bytes.
+    """
+
+    table = "extractions"
+    columns = (
+        "size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, hash TEXT NOT NULL, "
+        "data BLOB NOT NULL, bytes INTEGER NOT NULL"
+    )
+    cost = "bytes"
+
+    def __init__(self, path: str, max_bytes: int = 200 * 1024 * 1024) -> None:
+        super().__init__(path, max_bytes)
+
+    def key(self, file_name: str, variant: str) -> str:
+        path = os.path.normcase(os.path.abspath(file_name))
+        return hashlib.sha1(
+            f"{EXTRACTION_FORMAT}\0{path}\0{variant}".encode("utf-8")
+        ).hexdigest()
+
+    def get(self, file_name: str, variant: str = "") -> Optional[str]:
+        """
+        Returns the cached text of the file, or None if it is not cached or
+        the file changed.
+        """
+        try:
+            size, mtime_ns = file_signature(file_name)
+        except OSError:
+            return None
+        key = self.key(file_name, variant)
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT size, mtime_ns, hash, data FROM extractions WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None or row[0] != size:
+            self.misses += 1
+            return None
+
+        cached_size, cached_mtime_ns, cached_hash, data = row
+        if cached_mtime_ns != mtime_ns:
+            # Copied or touched files keep their entry if the content is the same
+            if file_hash(file_name) != cached_hash:
+                self.misses += 1
+                return None
+
+        with self._lock:
+            self._connection.execute(
+                "UPDATE extractions SET mtime_ns = ?, last_used = ? WHERE key = ?",
+                (mtime_ns, time.time(), key),
+            )
+            self._connection.commit()
+        self.hits += 1
+        return zlib.decompress(data).decode("utf-8")
+
+    def put(
+        self,
+        file_name: str,
+        variant: str,
+        text: str,
+        signature: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        """
+        Stores the text extracted from the file. signature is the
+        file_signature from before the extraction, the text is not stored if
+        the file changed since then.
+        """
+        try:
+            content_hash = file_hash(file_name)
+            size, mtime_ns = file_signature(file_name)
+        except OSError:
+            return
+        if signature is not None and signature != (size, mtime_ns):
+            return
+
+        data = zlib.compress(text.encode("utf-8"))
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO extractions "
+                "(key, size, mtime_ns, hash, data, bytes, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.key(file_name, variant),
+                    size,
+                    mtime_ns,
+                    content_hash,
+                    data,
+                    len(data),
+                    time.time(),
+                ),
+            )
+            self._evict()
+            self._connection.commit()
+
+
+def open_extraction_cache(
+    path: Optional[str], max_bytes: int
+) -> Optional[ExtractionCache]:
+    """
+    Opens the cache, or returns None if it cannot be opened so files still
+    load without it.
+    """
+    return open_sqlite_cache(ExtractionCache, path, max_bytes, "extraction cache")
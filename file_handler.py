@@ -1,124 +1,150 @@
 import io
-import xml.etree.ElementTree as ET
+import json
+import logging
 from pathlib import Path
-from typing import List
+from typing import IO, Any, Dict, Iterator, List, Optional, Union
 
-import aspose.words as aw
-from colorama import Fore, Style
-from docx import Document
-from docx2python import docx2python
+import rtf_reader
+from docx_tables import iter_table_rows
+from extraction_cache import ExtractionCache, file_signature
+from templates import SegmentPair, TemplateError, compile_template
+from text_reader import iter_text_chunks, read_text
+from timing import span
+from xliff_reader import read_targets
 
+logger = logging.getLogger(__name__)
 
-class FileHandler:
-    from text_editor import TextEditor
+# Formats whose text depends on the template
+TEMPLATE_EXTENSIONS = {"docx", "doc", "rtf"}
 
-    def __init__(self, text_editor: TextEditor) -> None:
-        self.text_editor = text_editor
+# Formats whose text is extracted, other files are read as plain text
+EXTRACTED_EXTENSIONS = TEMPLATE_EXTENSIONS | {"xliff", "mxliff"}
 
-    def read_docx_tables(self, file_path: str):
-        """
-        Reads all the tables in a docx file and returns them as a list.
-        """
-        document = Document(file_path)
-        tables = document.tables
 
-        return tables
+def file_extension(file_name: str) -> str:
+    # Batch checks collect X.DOCX as well
+    return Path(file_name).suffix.lstrip(".").lower()
+
 
-    def extract_table_columns(
-        self, table, columns: list[int], num_rows: int = -1
-    ) -> List[List[str]]:
+def is_plain_text(file_name: str) -> bool:
+    return file_extension(file_name) not in EXTRACTED_EXTENSIONS
+
+
+class FileHandler:
+    def __init__(
+        self,
+        template: Dict[str, Any],
+        extraction_cache: Optional[ExtractionCache] = None,
+    ) -> None:
+        # Only the template is needed, so files can be loaded without the UI
+        self.template = template
+        self.plan = compile_template(template)
+        self.extraction_cache = extraction_cache
+
+    def read_pairs(self, file_name: str) -> List[SegmentPair]:
         """
-        Extracts the contents of the specified columns of a table up to a specified number of rows.
+        Reads the source, target, ID and status of every row of the
+        template's tables in one pass over the document. python-docx rebuilds
+        the cell list of a row on every access, which is slow on large tables.
         """
-        extracted_columns = [[] for _ in range(len(columns))]
-
-        if num_rows == -1:
-            num_rows = len(table.rows)
-
-        for i, row in enumerate(table.rows):
-            if num_rows > -1 and i >= num_rows:
-                break
-            for j, col in enumerate(columns):
-                if col < len(row.cells):
-                    extracted_columns[j].append(row.cells[col].text.strip())
-            if i % 100 == 0:
-                print(
-                    f"{Fore.GREEN}Current row number: {i} of {len(table.rows)}{Style.RESET_ALL}, First column: {Fore.BLUE}{extracted_columns[0][-1]}{Style.RESET_ALL}"
+        plan = self.plan
+        if plan is None:
+            raise TemplateError(f"Template {self.template['name']} has no table")
+        tables = set(plan.tables)
+        if file_extension(file_name) == "rtf":
+            try:
+                return plan.read(rtf_reader.iter_table_rows(file_name, tables))
+            except (rtf_reader.RtfError, IndexError, UnicodeError) as e:
+                logger.warning(
+                    "Reading %s natively failed, using Aspose: %s", file_name, e
                 )
-        return extracted_columns
+        return plan.read(iter_table_rows(self._docx_source(file_name), tables))
 
     def load_file(self, file_name: str) -> str:
-        with open(file_name, "r") as file:
-            extension = Path(file_name).suffix.lstrip(".")
-            match extension:
-                case "docx" | "doc" | "rtf":
-                    file_path = None
-
-                    match extension:
-                        case "rtf":
-                            # Load file as bytesio
-                            with open(file_name, "rb") as f:
-                                data = f.read()
-
-                            stream = io.BytesIO(data)
-                            doc = aw.Document(stream)
-
-                            # Save as docx
-                            stream = io.BytesIO()
-                            doc.save(stream, aw.SaveFormat.DOCX)
-                            stream.seek(0)
-
-                            file_path = stream
-                        case "docx" | "doc":
-                            file_path = file_name
-
-                    current_template = self.text_editor.current_template
-
-                    if current_template.get("simple", True):
-                        with docx2python(file_path) as docx_content:
-                            text = docx_content.text
-                    else:
-                        tables = self.read_docx_tables(file_path)
-
-                        text = ""
-
-                        table = tables[current_template["row"]]
-                        column_index = current_template["target_col_index"]
-
-                        target1 = self.extract_table_columns(table, [column_index])[0]
-
-                        text = "\n".join(target1)
-                case "xliff":
-                    # Parse the xliff file
-                    root = ET.parse(file_name).getroot()
-
-                    # source = root.findall(".//{urn:oasis:names:tc:xliff:document:1.2}source")
-                    target = root.findall(
-                        ".//{urn:oasis:names:tc:xliff:document:1.2}target"
-                    )
-
-                    text = ""
+        with span("extract text", file=Path(file_name).name) as details:
+            cache = self.extraction_cache
+            # Decoding plain text is faster than reading it from the cache
+            if cache is None or is_plain_text(file_name):
+                text = self._load_file(file_name)
+            else:
+                variant = self.cache_variant(file_name)
+                cached = cache.get(file_name, variant)
+                details["cached"] = cached is not None
+                if cached is None:
+                    signature = file_signature(file_name)
+                    text = self._load_file(file_name)
+                    cache.put(file_name, variant, text, signature)
+                else:
+                    text = cached
+            details["characters"] = len(text)
+        return text
 
-                    for t in target:
-                        if t.text:
-                            text += t.text + "\n"
+    def iter_chunks(self, file_name: str) -> Iterator[str]:
+        """
+        Yields the text in chunks that end at line breaks. Plain text is
+        decoded piece by piece, so it never has to be in memory as a whole,
+        other formats are extracted at once.
+        """
+        if is_plain_text(file_name):
+            yield from iter_text_chunks(file_name)
+        else:
+            yield self.load_file(file_name)
 
-                case "mxliff":
-                    # Parse the xliff file
-                    root = ET.parse(file_name).getroot()
+    def cache_variant(self, file_name: str) -> str:
+        """
+        Returns what besides the file changes the extracted text.
+        """
+        if file_extension(file_name) in TEMPLATE_EXTENSIONS:
+            return json.dumps(self.template, sort_keys=True)
+        return ""
+
+    def _docx_source(self, file_name: str) -> Union[str, IO[bytes]]:
+        if file_extension(file_name) != "rtf":
+            return file_name
+
+        # Aspose takes seconds to import, so it is only loaded once an RTF
+        # file cannot be read natively
+        import aspose.words as aw
+
+        # Load file as bytesio
+        with open(file_name, "rb") as f:
+            data = f.read()
+
+        stream = io.BytesIO(data)
+        doc = aw.Document(stream)
+
+        # Save as docx
+        stream = io.BytesIO()
+        doc.save(stream, aw.SaveFormat.DOCX)
+        stream.seek(0)
+        return stream
+
+    def _read_document(self, file_name: str) -> str:
+        if file_extension(file_name) == "rtf":
+            try:
+                return rtf_reader.read_text(file_name)
+            except (rtf_reader.RtfError, UnicodeError) as e:
+                logger.warning(
+                    "Reading %s natively failed, using Aspose: %s", file_name, e
+                )
 
-                    # source = root.findall(".//{urn:oasis:names:tc:xliff:document:1.2}source")
-                    target = root.findall(
-                        ".//{urn:oasis:names:tc:xliff:document:1.2}target"
-                    )
+        from docx2python import docx2python
 
-                    text = ""
+        with docx2python(self._docx_source(file_name)) as docx_content:
+            return docx_content.text
 
-                    for t in target:
-                        if t.text:
-                            text += t.text + "\n"
+    def _load_file(self, file_name: str) -> str:
+        extension = file_extension(file_name)
+        match extension:
+            case "docx" | "doc" | "rtf":
+                if self.plan is None:
+                    text = self._read_document(file_name)
+                else:
+                    text = "\n".join(pair.target for pair in self.read_pairs(file_name))
+            case "xliff" | "mxliff":
+                text = "".join(f"{target}\n" for _, target in read_targets(file_name))
 
-                case _:
-                    text = file.read()
+            case _:
+                text = read_text(file_name)
 
         return text
@@ -1,6 +1,8 @@
 from PySide6.QtCore import QThread, Signal
 from PySide6.QtWidgets import QInputDialog
 
+from timing import span
+
 
 class FileLoaderWorker(QThread):
     fileLoaded = Signal(str)
@@ -12,11 +14,14 @@ class FileLoaderWorker(QThread):
 
         from file_handler import FileHandler
 
-        self.file_handler = FileHandler(text_editor)
+        self.file_handler = FileHandler(
+            text_editor.current_template, text_editor.extraction_cache
+        )
 
     def run(self):
         self.text_editor.statusBar().showMessage(f"Loading {self.file_name}...")
-        text = self.file_handler.load_file(self.file_name)
+        with span("load file"):
+            text = self.file_handler.load_file(self.file_name)
         self.fileLoaded.emit(text)
 
     def select_column(self, column_names) -> int:
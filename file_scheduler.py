@@ -0,0 +1,189 @@
+import heapq
+import itertools
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from check_engine import CheckCancelled
+from match_store import MatchRecord
+from timing import span
+
+logger = logging.getLogger(__name__)
+
+# The file the user is looking at goes before the others
+FOREGROUND = 0
+BACKGROUND = 1
+
+QUEUED = "queued"
+LOADING = "loading"
+CHECKING = "checking"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class FileJob:
+    def __init__(self, file_name: str, options: Dict[str, Any]) -> None:
+        self.file_name = file_name
+        self.options = options
+        self.priority = BACKGROUND
+        self.status = QUEUED
+        self.text = ""
+        self.matches: List[MatchRecord] = []
+        self.error = ""
+        self.cancelled = False
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+
+class FileScheduler:
+    """
+    Loads and checks files in the background on at most workers threads.
+    Queued files run in order of priority, the file the user is looking at
+    first, then the others in the order they were added. on_status is called
+    from the worker threads whenever the status of a file changes.
+
+    load returns the text of a job, check its matches. check gets a function
+    that returns True once the job is cancelled.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[FileJob], str],
+        check: Callable[[FileJob, Callable[[], bool]], List[MatchRecord]],
+        workers: int = 2,
+        on_status: Optional[Callable[[FileJob], None]] = None,
+    ) -> None:
+        self.load = load
+        self.check = check
+        self.workers = max(workers, 1)
+        self.on_status = on_status
+
+        self._jobs: Dict[str, FileJob] = {}
+        # (priority, order added, file name), entries of jobs that were
+        # prioritized since are skipped
+        self._queue: List[Tuple[int, int, str]] = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopped = False
+
+    def jobs(self) -> List[FileJob]:
+        with self._condition:
+            return list(self._jobs.values())
+
+    def job(self, file_name: str) -> Optional[FileJob]:
+        with self._condition:
+            return self._jobs.get(file_name)
+
+    def add(self, file_names: Iterable[str], options: Dict[str, Any]) -> None:
+        """
+        Queues the files. Files that are queued or running already are left
+        alone, finished ones are checked again.
+        """
+        with self._condition:
+            for file_name in file_names:
+                job = self._jobs.get(file_name)
+                if job is not None and not job.finished:
+                    continue
+                job = FileJob(file_name, options)
+                self._jobs[file_name] = job
+                self._push(job)
+            self._start_workers()
+            self._condition.notify_all()
+
+    def prioritize(self, file_name: str) -> None:
+        """
+        Runs the file next if it is still queued, the file prioritized before
+        goes back to the others.
+        """
+        with self._condition:
+            for job in self._jobs.values():
+                priority = FOREGROUND if job.file_name == file_name else BACKGROUND
+                if job.priority != priority:
+                    job.priority = priority
+                    if job.status == QUEUED:
+                        self._push(job)
+            self._condition.notify_all()
+
+    def cancel(self) -> None:
+        """
+        Drops all files, running checks stop after their current batch.
+        """
+        with self._condition:
+            for job in self._jobs.values():
+                job.cancelled = True
+            self._jobs.clear()
+            self._queue.clear()
+
+    def shutdown(self) -> None:
+        self.cancel()
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def _push(self, job: FileJob) -> None:
+        heapq.heappush(self._queue, (job.priority, next(self._order), job.file_name))
+
+    def _start_workers(self) -> None:
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work, name=f"file scheduler {len(self._threads)}"
+            )
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def _next(self) -> Optional[FileJob]:
+        with self._condition:
+            while not self._stopped:
+                while self._queue:
+                    priority, _, file_name = heapq.heappop(self._queue)
+                    job = self._jobs.get(file_name)
+                    if (
+                        job is not None
+                        and job.status == QUEUED
+                        and job.priority == priority
+                    ):
+                        job.status = LOADING
+                        return job
+                self._condition.wait()
+        return None
+
+    def _work(self) -> None:
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            self._notify(job)
+            self._run(job)
+
+    def _run(self, job: FileJob) -> None:
+        try:
+            with span("project load", file=job.file_name):
+                job.text = self.load(job)
+            self._set_status(job, CHECKING)
+            with span("project check", file=job.file_name):
+                job.matches = self.check(job, lambda: job.cancelled)
+        except CheckCancelled:
+            self._set_status(job, CANCELLED)
+        except Exception as e:
+            logger.warning("Checking %s failed: %s", job.file_name, e)
+            job.error = str(e)
+            self._set_status(job, FAILED)
+        else:
+            self._set_status(job, DONE)
+
+    def _set_status(self, job: FileJob, status: str) -> None:
+        job.status = status
+        self._notify(job)
+
+    def _notify(self, job: FileJob) -> None:
+        if self.on_status is None or job.cancelled:
+            return
+        try:
+            self.on_status(job)
+        except Exception as e:
+            logger.warning("Status callback failed: %s", e)
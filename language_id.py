@@ -0,0 +1,226 @@
+import re
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sized,
+    Tuple,
+)
+
+from check_engine import CheckStats, Segment, check_segments
+from match_cache import checker_config
+from match_store import MatchRecord
+
+# Frequent short words of the languages with a checker and of their
+# neighbours, so Italian, Dutch or Portuguese segments are recognized and
+# skipped instead of being checked as Spanish or German. Words that are
+# common in more than one of them, like "de", "la", "que" or "para", are left
+# out, they would only make the languages tie.
+STOPWORDS = {
+    "de": "der und ist nicht ein eine zu den mit von sich auf für dem ich sie"
+    " wird im auch werden aus hat dass bei oder wie nach noch wir kann sind über"
+    " ihr ihre wurde wurden konnte können möchten bitte diese dieser dieses"
+    " einen einem keine nur schon sehr",
+    "en": "the and of to that it for was on are with be this by not you at from"
+    " have or an but which they their will has would there what can all your"
+    " if we been were these those could should does into than its our who how"
+    " why when where about",
+    "fr": "les et est une du qui dans pour pas sur au avec ce ne sont par plus"
+    " elle nous vous aux cette été être votre vos ceci cela cet ces mon mes ses"
+    " leur leurs sera avez êtes voulez veuillez suis très aussi",
+    "es": "el los las y al más pero sus son también fue hay muy puede esto estos"
+    " usted haga desea cuando hasta desde todo todos ya",
+    "it": "di che è per non sono della gli ma anche nel alla più questo questa"
+    " questi essere sei siamo hanno lo dei delle degli sul nella vuoi",
+    "nl": "het een van dat niet op zijn met voor ook aan maar bij wordt heeft"
+    " door naar dit deze u uw wilt worden werd geen nog wel hebt",
+    "pt": "o os em um uma com não mais ao mas foi são isto esse essa seu sua"
+    " você pelo pela",
+}
+
+# Letter sequences typical of one language, for segments without stopwords
+TRIGRAMS = {
+    "de": "sch ich cht ein ung eit ier gen ver ach",
+    "en": "the ing and hat tha ght ion wit ous ers",
+    "fr": "les ent que eur ons ais oir eau ait tio",
+    "es": "ció que los las ado ión nte ara dad ien",
+    "it": "che zio ell gli lla nto del one ità are",
+    "nl": "een ijk sch aar oor cht ver ijn ede ten",
+    "pt": "ção ões que ado nte mos dos ara ais ent",
+}
+
+# Letters that only occur in some of the languages
+LETTERS = {
+    "ß": ("de",),
+    "ä": ("de",),
+    "ö": ("de", "nl"),
+    "ü": ("de",),
+    "ñ": ("es",),
+    "¿": ("es",),
+    "¡": ("es",),
+    "ç": ("fr", "pt"),
+    "œ": ("fr",),
+    "ã": ("pt",),
+    "õ": ("pt",),
+}
+
+# Segments in another script are in none of the languages
+OTHER_SCRIPT = "other"
+
+# Scores below this leave a segment to the selected language. Segments of
+# fewer than eight words need less, but at least one stopword or four letter
+# sequences, so a UI string like "This is a test." is recognized.
+MIN_SCORE = 2.0
+MIN_SCORE_PER_WORD = 0.25
+MIN_SHORT_SCORE = 1.0
+
+# How far the best language has to be ahead of the next one
+MARGIN = 1.5
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+
+def _index(table: Dict[str, str]) -> Dict[str, Tuple[str, ...]]:
+    index: Dict[str, List[str]] = {}
+    for language, words in table.items():
+        for word in words.split():
+            index.setdefault(word, []).append(language)
+    return {word: tuple(languages) for word, languages in index.items()}
+
+
+_STOPWORDS = _index(STOPWORDS)
+_TRIGRAMS = _index(TRIGRAMS)
+
+
+def identify(text: str) -> Optional[str]:
+    """
+    Returns the two letter code of the language of a segment, OTHER_SCRIPT
+    for text that is mostly not in Latin letters, or None if the segment is
+    too short or too mixed to tell.
+    """
+    words = _WORD.findall(text.lower())
+    if not words:
+        return None
+
+    letters = sum(len(word) for word in words)
+    other = sum(
+        1
+        for word in words
+        for char in word
+        if char > "\u024f" and not "\u1e00" <= char <= "\u1eff"
+    )
+    if other * 2 > letters:
+        return OTHER_SCRIPT
+
+    scores: Dict[str, float] = dict.fromkeys(STOPWORDS, 0.0)
+    trigram_scores: Dict[str, float] = dict.fromkeys(STOPWORDS, 0.0)
+    for word in words:
+        languages = _STOPWORDS.get(word, ())
+        for language in languages:
+            scores[language] += 1 / len(languages)
+        for i in range(len(word) - 2):
+            languages = _TRIGRAMS.get(word[i : i + 3], ())
+            for language in languages:
+                trigram_scores[language] += 0.25 / len(languages)
+    for char, languages in LETTERS.items():
+        if char in text:
+            for language in languages:
+                scores[language] += 1
+    for language, score in trigram_scores.items():
+        scores[language] += score
+
+    ranked = sorted(
+        scores, key=lambda language: (scores[language], trigram_scores[language])
+    )
+    best, second = ranked[-1], ranked[-2]
+    min_score = max(MIN_SHORT_SCORE, MIN_SCORE_PER_WORD * len(words))
+    if scores[best] < min(MIN_SCORE, min_score):
+        return None
+    if scores[best] >= scores[second] * MARGIN:
+        return best
+    # When the words tie, the letter sequences decide
+    if trigram_scores[best] >= max(trigram_scores[second] * MARGIN, 0.5):
+        return best
+    return None
+
+
+def route_segments(
+    segments: Iterable[Segment], language: str, languages: List[str]
+) -> Tuple[Dict[str, List[Segment]], List[Segment]]:
+    """
+    Groups the segments by the checker language they need, the selected
+    language first. It gets the segments that cannot be identified and those
+    in its own language, so en-GB stays en-GB. Other languages go to the first
+    of languages with their code. Segments in languages without a checker are
+    returned separately and not checked.
+    """
+    codes: Dict[str, str] = {}
+    for checker_language in languages:
+        codes.setdefault(checker_language.split("-")[0], checker_language)
+    codes[language.split("-")[0]] = language
+
+    groups: Dict[str, List[Segment]] = {language: []}
+    skipped: List[Segment] = []
+    for segment in segments:
+        identified = identify(segment.text)
+        code = language if identified is None else codes.get(identified)
+        if code is None:
+            skipped.append(segment)
+        else:
+            groups.setdefault(code, []).append(segment)
+    return groups, skipped
+
+
+def check_languages(
+    groups: Mapping[str, Iterable[Segment]],
+    checkers: Callable[[str], ContextManager[List[Any]]],
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    stats: Optional[CheckStats] = None,
+    **options: Any,
+) -> List[MatchRecord]:
+    """
+    Checks every group of segments with the checkers of its language, which
+    checkers yields, one language after the other. A group may be an
+    iterator, see check_segments, whose options this takes. Progress is
+    reported in segments of all groups. Returns the matches sorted by
+    document offset.
+    """
+    sizes = [
+        len(segments) for segments in groups.values() if isinstance(segments, Sized)
+    ]
+    # Iterators have no length, so there is no total then
+    total = sum(sizes) if len(sizes) == len(groups) else 0
+    before = 0
+    matches: List[MatchRecord] = []
+
+    for language, segments in groups.items():
+        if isinstance(segments, Sized) and not len(segments):
+            continue
+
+        def progress(done: int, _: int, before: int = before) -> None:
+            if on_progress:
+                on_progress(before + done, total)
+
+        group_stats = CheckStats()
+        with checkers(language) as language_checkers:
+            matches.extend(
+                check_segments(
+                    segments,
+                    language_checkers,
+                    on_progress=progress,
+                    cache_config=checker_config(language, language_checkers[0]),
+                    stats=group_stats,
+                    **options,
+                )
+            )
+        before += group_stats.segments
+        if stats is not None:
+            stats.add(group_stats)
+
+    matches.sort(key=lambda match: match.offset)
+    return matches
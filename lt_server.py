@@ -0,0 +1,327 @@
+import http.client
+import json
+import logging
+import shlex
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlencode, urlsplit
+
+from timing import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URL = "http://localhost:8081"
+
+# Errors after which a connection is dropped and the server checked
+CONNECTION_ERRORS = (OSError, http.client.HTTPException)
+
+
+class ServerError(Exception):
+    pass
+
+
+def default_server_command(port: int) -> Optional[List[str]]:
+    """
+    Returns the command that starts the LanguageTool server downloaded by
+    language_tool_python, or None if it is not available.
+    """
+    try:
+        from language_tool_python import download_lt, utils  # type: ignore
+
+        download_lt.download_lt()
+        return list(utils.get_server_cmd(port))
+    except Exception as e:
+        logger.warning("Cannot find the LanguageTool server to start: %s", e)
+        return None
+
+
+class ServerMatch:
+    """
+    A match from the JSON answer of the server, with the attributes of a
+    language_tool_python match that MatchRecord.from_match reads.
+    """
+
+    def __init__(self, fields: Dict[str, Any]) -> None:
+        rule = fields.get("rule", {})
+        self.offset = fields["offset"]
+        self.error_length = fields["length"]
+        self.rule_id = rule.get("id", "")
+        self.category = rule.get("category", {}).get("id", "")
+        self.rule_issue_type = rule.get("issueType", "")
+        self.message = fields.get("message", "")
+        self.replacements = [
+            replacement["value"] for replacement in fields.get("replacements", [])
+        ]
+        self.context = fields.get("context", {}).get("text", "")
+        self.sentence = fields.get("sentence", "")
+
+
+class ServerChecker:
+    """
+    Checks text of one language on a shared LanguageToolServer. Has the
+    check/close interface of language_tool_python.LanguageTool, so it can be
+    used in a CheckerPool. Creating and closing it is cheap, the server keeps
+    running.
+    """
+
+    def __init__(self, server: "LanguageToolServer", language: str) -> None:
+        self.server = server
+        self.language = language
+        self.enabled_rules: Set[str] = set()
+        self.disabled_rules: Set[str] = set()
+        self.language_tool_download_version = server.version
+
+    @property
+    def url(self) -> str:
+        return self.server.url
+
+    def check(self, text: str) -> List[ServerMatch]:
+        parameters = {"language": self.language, "text": text}
+        if self.enabled_rules:
+            parameters["enabledRules"] = ",".join(sorted(self.enabled_rules))
+        if self.disabled_rules:
+            parameters["disabledRules"] = ",".join(sorted(self.disabled_rules))
+        result = self.server.request("/v2/check", parameters)
+        return [ServerMatch(fields) for fields in result.get("matches", [])]
+
+    def close(self) -> None:
+        pass
+
+
+class LanguageToolServer:
+    """
+    Client of a long-running local LanguageTool HTTP server that several
+    editor windows and batch checks share, so they use one warm JVM.
+
+    Requests go over a pool of keep-alive connections, at most
+    max_connections at a time. If the server does not answer and start is
+    True, it is started with command (default: the server downloaded by
+    language_tool_python) and the request is sent again. Once it ran, the
+    server is checked every health_interval seconds until close and started
+    again if it went away, which restarts counts. stop also stops a server
+    that was started here.
+    """
+
+    def __init__(
+        self,
+        url: str = DEFAULT_URL,
+        command: Optional[List[str]] = None,
+        start: bool = True,
+        max_connections: int = 4,
+        timeout: float = 60,
+        startup_timeout: float = 120,
+        health_interval: float = 30,
+    ) -> None:
+        parts = urlsplit(url)
+        self.url = url.rstrip("/")
+        self.host = parts.hostname or "localhost"
+        self.https = parts.scheme == "https"
+        self.port = parts.port or (443 if self.https else 80)
+        self.command = command
+        self.start = start
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.health_interval = health_interval
+        self.version = ""
+        self.requests = 0
+        self.restarts = 0
+
+        self._process: Optional[subprocess.Popen] = None
+        self._connections: List[http.client.HTTPConnection] = []
+        self._connections_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._start_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+
+    def checker(self, language: str) -> ServerChecker:
+        """
+        Returns a checker for the language, starting the server if needed.
+        Usable as CheckerPool factory.
+        """
+        self.ensure_running()
+        return ServerChecker(self, language)
+
+    def _new_connection(self, timeout: float) -> http.client.HTTPConnection:
+        if self.https:
+            return http.client.HTTPSConnection(self.host, self.port, timeout=timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+    def _connect(self) -> http.client.HTTPConnection:
+        with self._connections_lock:
+            if self._connections:
+                return self._connections.pop()
+        return self._new_connection(self.timeout)
+
+    def _reuse(self, connection: http.client.HTTPConnection) -> None:
+        with self._connections_lock:
+            if len(self._connections) < self.max_connections:
+                self._connections.append(connection)
+                return
+        connection.close()
+
+    def _post(
+        self, connection: http.client.HTTPConnection, path: str, body: bytes
+    ) -> Dict[str, Any]:
+        connection.request(
+            "POST",
+            path,
+            body=body,
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded; charset=utf-8",
+                "Accept": "application/json",
+            },
+        )
+        response = connection.getresponse()
+        data = response.read()
+        if response.status != 200:
+            raise ServerError(
+                f"LanguageTool server answered {response.status}: "
+                f"{data[:200].decode('utf-8', 'replace')}"
+            )
+        return json.loads(data)
+
+    def request(self, path: str, parameters: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Posts the parameters to the server and returns the JSON answer. A
+        request that fails because of the connection is sent once more, after
+        making sure the server runs.
+        """
+        body = urlencode(parameters).encode("utf-8")
+        with self._slots:
+            try:
+                return self._send(path, body)
+            except CONNECTION_ERRORS as e:
+                # Idle keep-alive connections may have been closed by the server
+                logger.info("Request to %s failed, retrying: %s", self.url, e)
+                self._drop_connections()
+                self.ensure_running()
+            try:
+                return self._send(path, body)
+            except CONNECTION_ERRORS as e:
+                raise ServerError(f"LanguageTool server failed: {e}") from e
+
+    def _send(self, path: str, body: bytes) -> Dict[str, Any]:
+        connection = self._connect()
+        try:
+            result = self._post(connection, path, body)
+        except BaseException:
+            connection.close()
+            raise
+        self._reuse(connection)
+        self.requests += 1
+        return result
+
+    def _drop_connections(self) -> None:
+        with self._connections_lock:
+            connections = self._connections
+            self._connections = []
+        for connection in connections:
+            connection.close()
+
+    def is_healthy(self) -> bool:
+        """
+        Checks a short text, which also tells the server version.
+        """
+        connection = self._new_connection(5)
+        body = urlencode({"language": "en-US", "text": "."}).encode("utf-8")
+        try:
+            result = self._post(connection, "/v2/check", body)
+        except (ServerError, ValueError, *CONNECTION_ERRORS):
+            return False
+        finally:
+            connection.close()
+        self.version = result.get("software", {}).get("version", self.version)
+        return True
+
+    def ensure_running(self) -> None:
+        """
+        Starts the server if it does not answer. Raises ServerError if it
+        cannot be started.
+        """
+        with self._start_lock:
+            if self.is_healthy():
+                self._start_monitor()
+                return
+            if not self.start:
+                raise ServerError(f"LanguageTool server {self.url} is not running")
+
+            with span("start server", url=self.url):
+                self._start_process()
+                deadline = time.monotonic() + self.startup_timeout
+                while not self.is_healthy():
+                    process = self._process
+                    if process is not None and process.poll() is not None:
+                        raise ServerError(
+                            f"LanguageTool server exited with {process.returncode}"
+                        )
+                    if time.monotonic() > deadline:
+                        raise ServerError(
+                            f"LanguageTool server {self.url} did not start in "
+                            f"{self.startup_timeout:.0f} s"
+                        )
+                    time.sleep(0.5)
+            self._start_monitor()
+
+    def _start_process(self) -> None:
+        command = self.command or default_server_command(self.port)
+        if not command:
+            raise ServerError(f"No command to start the server at {self.url}")
+        if self._process is not None:
+            if self._process.poll() is None:
+                # Started but not answering
+                self._process.kill()
+                self._process.wait()
+            self.restarts += 1
+        logger.info("Starting LanguageTool server: %s", shlex.join(command))
+        # Its own session, so the server keeps running for other instances
+        self._process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+    def _start_monitor(self) -> None:
+        if self.health_interval <= 0 or self._monitor is not None:
+            return
+        self._monitor = threading.Thread(
+            target=self._watch, name="LanguageTool server monitor"
+        )
+        self._monitor.daemon = True
+        self._monitor.start()
+
+    def _watch(self) -> None:
+        while not self._closed.wait(self.health_interval):
+            if self.is_healthy():
+                continue
+            logger.warning("LanguageTool server %s stopped answering", self.url)
+            self._drop_connections()
+            try:
+                self.ensure_running()
+            except ServerError as e:
+                logger.warning("Restarting LanguageTool server failed: %s", e)
+
+    def close(self) -> None:
+        """
+        Closes the connections. The server keeps running for other instances.
+        """
+        self._closed.set()
+        self._drop_connections()
+
+    def stop(self) -> None:
+        """
+        Closes the connections and stops the server if it was started here.
+        """
+        self.close()
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._process = None
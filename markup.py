@@ -0,0 +1,112 @@
+import re
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Tuple
+
+from match_store import MatchRecord
+
+if TYPE_CHECKING:
+    # check_engine imports this module
+    from check_engine import Segment
+
+# Inline tags (<b>, </g>, <ph id="1"/>), format placeholders ({0}, {name}) and
+# printf placeholders (%s, %1$s, %d, %1). Markup never spans lines, so the
+# paragraphs stay the same. %i is left alone, "50%ige" is a German word.
+MARKUP_PATTERN = re.compile(
+    r"<[^<>\n]*>|\{[^{}\s]*\}|%(?:\d+\$)?(?:\.\d+)?[sdf@]|%\d+\b"
+)
+
+
+class OffsetMap:
+    """
+    Maps positions in stripped segments back to the original text. Positions
+    in a stripped segment are counted from the start of the original segment,
+    so the segments keep their offsets. Only the positions where markup was
+    removed are stored, with the characters removed from the segment start up
+    to there.
+    """
+
+    def __init__(self) -> None:
+        self.starts: List[int] = []
+        self.shifts: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def add(self, position: int, shift: int) -> None:
+        self.starts.append(position)
+        self.shifts.append(shift)
+
+    def to_original(self, position: int) -> int:
+        index = bisect_right(self.starts, position) - 1
+        return position if index < 0 else position + self.shifts[index]
+
+    def map_record(self, record: MatchRecord) -> MatchRecord:
+        """
+        Moves a match to the original text. A match around removed markup
+        covers the markup as well.
+        """
+        start = self.to_original(record.offset)
+        if record.length <= 0:
+            return record.moved(start)
+        end = self.to_original(record.end - 1) + 1
+        return record.moved(start, end - start)
+
+    def map_records(self, records: List[MatchRecord]) -> List[MatchRecord]:
+        if not self.starts:
+            return records
+        return [self.map_record(record) for record in records]
+
+
+def strip_markup(text: str) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Removes markup and placeholders in one pass. Returns the stripped text and
+    (position in the stripped text, characters removed up to there) for every
+    removal. A space after markup between spaces is removed too, so the
+    checker does not see a repeated space.
+    """
+    parts: List[str] = []
+    removals: List[Tuple[int, int]] = []
+    length = 0
+    last = 0
+    before = ""
+    for match in MARKUP_PATTERN.finditer(text):
+        start, end = match.span()
+        if start > last:
+            parts.append(text[last:start])
+            length += start - last
+            before = text[start - 1]
+        if before in ("", " ", "\t") and text[end : end + 1] == " ":
+            end += 1
+        last = end
+        removals.append((length, end - length))
+    if not removals:
+        return text, removals
+    parts.append(text[last:])
+    return "".join(parts), removals
+
+
+def iter_stripped(
+    segments: Iterable["Segment"], offset_map: OffsetMap
+) -> Iterator["Segment"]:
+    """
+    Strips markup from every segment as it is read. The stripped segments keep
+    their offsets, the removals are added to offset_map to move matches in
+    them to the original text.
+    """
+    for segment in segments:
+        text, removals = strip_markup(segment.text)
+        if removals:
+            for position, shift in removals:
+                offset_map.add(segment.offset + position, shift)
+            # Positions after the stripped segment belong to the next one
+            offset_map.add(segment.offset + len(text), 0)
+        yield segment._replace(text=text)
+
+
+def strip_segments(segments: List["Segment"]) -> Tuple[List["Segment"], OffsetMap]:
+    """
+    Strips markup from every segment. Matches in the stripped segments are
+    moved to the original text with the returned map.
+    """
+    offset_map = OffsetMap()
+    return list(iter_stripped(segments, offset_map)), offset_map
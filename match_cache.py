@@ -0,0 +1,119 @@
+import hashlib
+import json
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from match_store import MatchRecord
+from sqlite_cache import SqliteCache, open_sqlite_cache
+
+# Changes whenever the stored match fields change
+CACHE_FORMAT = 2
+
+
+def checker_config(language: str, checker: Any) -> str:
+    """
+    Describes everything besides the text that changes the matches of a
+    checker: language, LanguageTool version and the rule configuration.
+    """
+    package = sys.modules.get(type(checker).__module__.split(".")[0])
+    config: Dict[str, Any] = {
+        "format": CACHE_FORMAT,
+        "language": language,
+        "version": [
+            getattr(package, "__version__", ""),
+            getattr(checker, "language_tool_download_version", ""),
+        ],
+    }
+    for name in [
+        "enabled_rules",
+        "disabled_rules",
+        "enabled_categories",
+        "disabled_categories",
+    ]:
+        config[name] = sorted(getattr(checker, name, None) or [])
+    config["enabled_rules_only"] = bool(getattr(checker, "enabled_rules_only", False))
+    return json.dumps(config, sort_keys=True)
+
+
+class MatchCache(SqliteCache):
+    """
+    Persistent cache of the matches of single segments, keyed by a hash of
+    the checker configuration and the segment text. The least recently used
+    entries are removed when there are more than max_entries.
+    """
+
+    table = "matches"
+    columns = "matches TEXT NOT NULL"
+
+    def __init__(self, path: str, max_entries: int = 200000) -> None:
+        super().__init__(path, max_entries)
+
+    def key(self, config: str, text: str) -> str:
+        return hashlib.sha1(f"{config}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(
+        self, config: str, texts: Iterable[str]
+    ) -> Dict[str, List[MatchRecord]]:
+        """
+        Returns the cached matches of the given texts, with offsets relative
+        to the start of the text. Texts that are not cached are left out.
+        """
+        keys = {self.key(config, text): text for text in texts}
+        found: Dict[str, List[MatchRecord]] = {}
+
+        with self._lock:
+            key_list = list(keys)
+            # Stay below SQLite's limit of host parameters
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i : i + 500]
+                rows = self._connection.execute(
+                    "SELECT key, matches FROM matches WHERE key IN "
+                    f"({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, matches in rows:
+                    found[keys[key]] = [
+                        MatchRecord.from_dict(fields) for fields in json.loads(matches)
+                    ]
+                self._connection.executemany(
+                    "UPDATE matches SET last_used = ? WHERE key = ?",
+                    [(time.time(), key) for key, _ in rows],
+                )
+            self._connection.commit()
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        return found
+
+    def put_many(self, config: str, entries: Dict[str, List[MatchRecord]]) -> None:
+        """
+        Stores the matches of texts, with offsets relative to the start of the
+        text.
+        """
+        now = time.time()
+        rows = [
+            (
+                self.key(config, text),
+                json.dumps([record.to_dict() for record in records]),
+                now,
+            )
+            for text, records in entries.items()
+        ]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO matches (key, matches, last_used) "
+                "VALUES (?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._connection.commit()
+
+
+def open_cache(path: Optional[str], max_entries: int) -> Optional[MatchCache]:
+    """
+    Opens the cache, or returns None if it cannot be opened so checks still
+    work without it.
+    """
+    return open_sqlite_cache(MatchCache, path, max_entries, "match cache")
@@ -0,0 +1,245 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+
+def _intern(value: Optional[str]) -> str:
+    # Rule ids, categories and messages repeat a lot, keep each string once
+    return sys.intern(value) if value else ""
+
+
+class MatchRecord:
+    """
+    A single LanguageTool match at a document offset.
+    """
+
+    __slots__ = (
+        "offset",
+        "length",
+        "rule_id",
+        "category",
+        "issue_type",
+        "message",
+        "replacements",
+        "context",
+        "sentence",
+    )
+
+    def __init__(
+        self,
+        offset: int,
+        length: int,
+        rule_id: str = "",
+        category: str = "",
+        issue_type: str = "",
+        message: str = "",
+        replacements: Sequence[str] = (),
+        context: str = "",
+        sentence: str = "",
+    ) -> None:
+        self.offset = offset
+        self.length = length
+        self.rule_id = _intern(rule_id)
+        self.category = _intern(category)
+        self.issue_type = _intern(issue_type)
+        self.message = _intern(message)
+        self.replacements = tuple(replacements or ())
+        self.context = context or ""
+        self.sentence = _intern(sentence)
+
+    @classmethod
+    def from_match(cls, match: Any, offset: Optional[int] = None) -> "MatchRecord":
+        """
+        Creates a record from a language_tool_python match.
+        """
+        return cls(
+            match.offset if offset is None else offset,
+            match.error_length,
+            getattr(match, "rule_id", ""),
+            getattr(match, "category", ""),
+            getattr(match, "rule_issue_type", ""),
+            getattr(match, "message", ""),
+            getattr(match, "replacements", ()),
+            getattr(match, "context", ""),
+            getattr(match, "sentence", ""),
+        )
+
+    @classmethod
+    def from_dict(cls, fields: Dict[str, Any]) -> "MatchRecord":
+        return cls(**fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields["replacements"] = list(self.replacements)
+        return fields
+
+    def moved(self, offset: int, length: Optional[int] = None) -> "MatchRecord":
+        record = MatchRecord.__new__(MatchRecord)
+        for name in self.__slots__:
+            setattr(record, name, getattr(self, name))
+        record.offset = offset
+        if length is not None:
+            record.length = length
+        return record
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.length
+
+    def error_type(self) -> str:
+        return f"{self.issue_type} - {self.category}"
+
+    def tooltip(self) -> str:
+        return f"{self.error_type()}\n{self.message}\n→ {list(self.replacements)}\nContext: {self.context}\n{self.sentence}"
+
+    def __repr__(self) -> str:
+        return f"MatchRecord({self.offset}, {self.length}, {self.rule_id!r})"
+
+
+class MatchStore:
+    """
+    Matches of a document sorted by offset, with an array of the offsets to
+    find the matches at a position or in a range with bisect. Matches at the
+    same offset or overlapping matches are all kept.
+
+    Edits move the matches after them by a pending shift, which applies to
+    the offsets from index _shift_from on. The array is only updated between
+    two edits, and a record only gets its new offset when it is read, so
+    typing costs the same however many matches follow.
+    """
+
+    def __init__(self, records: Iterable[MatchRecord] = ()) -> None:
+        self._records: List[MatchRecord] = []
+        self._offsets = array("q")
+        self._max_length = 0
+        self._shift = 0
+        self._shift_from = 0
+        self.add(records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[MatchRecord]:
+        for index in range(len(self._records)):
+            yield self[index]
+
+    def __getitem__(self, index: int) -> MatchRecord:
+        record = self._records[index]
+        offset = self._offset(index)
+        if record.offset != offset:
+            record = self._records[index] = record.moved(offset)
+        return record
+
+    def _offset(self, index: int) -> int:
+        if index >= self._shift_from:
+            return self._offsets[index] + self._shift
+        return self._offsets[index]
+
+    def _move_shift(self, index: int) -> None:
+        """
+        Makes the pending shift start at index, applying it to the offsets
+        between the old and the new start.
+        """
+        if self._shift:
+            if index > self._shift_from:
+                offsets = self._offsets[self._shift_from : index]
+                self._offsets[self._shift_from : index] = array(
+                    "q", [offset + self._shift for offset in offsets]
+                )
+            elif index < self._shift_from:
+                offsets = self._offsets[index : self._shift_from]
+                self._offsets[index : self._shift_from] = array(
+                    "q", [offset - self._shift for offset in offsets]
+                )
+        self._shift_from = index
+
+    def _apply_shift(self) -> None:
+        self._move_shift(len(self._records))
+        self._shift = 0
+        for index, record in enumerate(self._records):
+            if record.offset != self._offsets[index]:
+                self._records[index] = record.moved(self._offsets[index])
+
+    def add(self, records: Iterable[MatchRecord]) -> bool:
+        """
+        Adds matches and returns whether they all went after the existing
+        ones, so the indices of the existing matches did not change.
+        """
+        new_records = sorted(records, key=attrgetter("offset"))
+        if not new_records:
+            return True
+        self._apply_shift()
+        self._max_length = max(
+            self._max_length, max(record.length for record in new_records)
+        )
+
+        if not self._offsets or new_records[0].offset >= self._offsets[-1]:
+            self._records.extend(new_records)
+            self._offsets.extend(record.offset for record in new_records)
+            self._shift_from = len(self._records)
+            return True
+
+        # Appending sorted runs keeps the sort cheap
+        self._records.extend(new_records)
+        self._records.sort(key=attrgetter("offset"))
+        self._offsets = array("q", (record.offset for record in self._records))
+        self._shift_from = len(self._records)
+        return False
+
+    def edited(self, position: int, removed: int, added: int) -> int:
+        """
+        Moves the matches after an edit that replaced removed characters at
+        position with added ones and drops the matches the edit touched.
+        Returns the number of dropped matches, the indices of the others only
+        change if that is not 0.
+        """
+        # Only matches starting before the end of the edit can touch it
+        first = self.index_of(position - self._max_length)
+        last = self.index_of(position + removed)
+        self._move_shift(first)
+
+        kept = [
+            index
+            for index in range(first, last)
+            if self._offset(index) < position
+            and self._offset(index) + self._records[index].length <= position
+        ]
+        dropped = last - first - len(kept)
+        if dropped:
+            self._records[first:last] = [self._records[index] for index in kept]
+            self._offsets[first:last] = array(
+                "q", [self._offsets[index] for index in kept]
+            )
+
+        # The matches before the edit keep their offsets
+        self._move_shift(first + len(kept))
+        self._shift += added - removed
+        return dropped
+
+    def index_of(self, position: int) -> int:
+        """
+        Returns the index of the first match starting at or after position.
+        """
+        index = bisect_left(self._offsets, position, 0, self._shift_from)
+        if index < self._shift_from:
+            return index
+        return bisect_left(self._offsets, position - self._shift, self._shift_from)
+
+    def _index_after(self, position: int) -> int:
+        index = bisect_right(self._offsets, position, 0, self._shift_from)
+        if index < self._shift_from:
+            return index
+        return bisect_right(self._offsets, position - self._shift, self._shift_from)
+
+    def at(self, position: int) -> List[MatchRecord]:
+        """
+        Returns the matches covering position.
+        """
+        first = self._index_after(position - self._max_length)
+        last = self._index_after(position)
+        records = (self[index] for index in range(first, last))
+        return [
+            record for record in records if record.offset + record.length > position
+        ]
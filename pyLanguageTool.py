@@ -1,39 +1,13 @@
+import logging
 import os
 import sys
-from typing import Any, Dict, List
 
 from PySide6.QtCore import QSettings, Qt
 from PySide6.QtWidgets import (
     QApplication,
 )
 
-templates: List[Dict[str, Any]] = [
-    {
-        "name": "Smartcat",
-        "simple": False,
-        "row": 0,
-        "source_col_index": 1,
-        "target_col_index": 2,
-    },
-    {
-        "name": "MemoQ",
-        "simple": False,
-        "row": 0,
-        "source_col_index": 1,
-        "target_col_index": 2,
-    },
-    {
-        "name": "Memsouce",
-        "simple": False,
-        "row": 0,
-        "source_col_index": 3,
-        "target_col_index": 4,
-    },
-    {
-        "name": "Target General",
-        "simple": True,
-    },
-]
+from templates import templates  # noqa: F401 (re-exported for the UI)
 
 error_type_color_map = {
     "uncategorized": Qt.GlobalColor.magenta,
@@ -43,6 +17,12 @@ error_type_color_map = {
 
 
 if __name__ == "__main__":
+    # PYLANGUAGETOOL_LOG=DEBUG logs every match and the duration of every phase
+    logging.basicConfig(
+        level=os.environ.get("PYLANGUAGETOOL_LOG", "WARNING").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
     # Set the organization name and application name for QSettings
     QApplication.setOrganizationName("Andre Jonas")
     QApplication.setApplicationName("pyLanguageTool")
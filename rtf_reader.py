@@ -0,0 +1,432 @@
+import codecs
+import logging
+import re
+from bisect import bisect_left
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the file at a time
+CHUNK_SIZE = 1024 * 1024
+
+# Tokens are only read this far from the end of the buffer until the file
+# ends, so control words and their parameters are never cut off
+_LOOKAHEAD = 64
+
+_TOKEN = re.compile(
+    rb"\\([a-zA-Z]{1,32})(-?\d{1,10})? ?"  # control word
+    rb"|\\'([0-9a-fA-F]{2})"  # byte in the code page
+    rb"|\\([^a-zA-Z])"  # control symbol
+    rb"|([{}])"
+    rb"|[\r\n]+"
+    rb"|([^\\{}\r\n]+)",
+    re.DOTALL,
+)
+
+# Groups whose content is not document text
+SKIPPED_DESTINATIONS = {
+    "annotation",
+    "atnauthor",
+    "atnid",
+    "colortbl",
+    "comment",
+    "datastore",
+    "fldinst",
+    "fonttbl",
+    "footer",
+    "footerf",
+    "footerl",
+    "footerr",
+    "footnote",
+    "generator",
+    "header",
+    "headerf",
+    "headerl",
+    "headerr",
+    "info",
+    "listoverridetable",
+    "listtable",
+    "object",
+    "pict",
+    "revtbl",
+    "rsidtbl",
+    "stylesheet",
+    "themedata",
+    "xmlnstbl",
+}
+
+SYMBOLS = {
+    "bullet": "\u2022",
+    "emdash": "\u2014",
+    "endash": "\u2013",
+    "emspace": "\u2003",
+    "enspace": "\u2002",
+    "ldblquote": "\u201c",
+    "lquote": "\u2018",
+    "rdblquote": "\u201d",
+    "rquote": "\u2019",
+    "line": "\n",
+    "tab": "\t",
+}
+
+CONTROL_SYMBOLS = {
+    "\\": "\\",
+    "{": "{",
+    "}": "}",
+    "~": "\u00a0",
+    # Non-breaking and optional hyphens, like the DOCX reader
+    "_": "-",
+    "-": "",
+}
+
+CODE_PAGES = {"ansi": "cp1252", "mac": "mac_roman", "pc": "cp437", "pca": "cp850"}
+
+
+class RtfError(Exception):
+    pass
+
+
+class _Group:
+    """
+    State that ends with the group: whether its content is skipped, the
+    number of fallback characters after \\u and the table nesting level.
+    """
+
+    def __init__(self, parent: Optional["_Group"] = None) -> None:
+        self.skip: bool = parent.skip if parent else False
+        self.uc: int = parent.uc if parent else 1
+        self.in_table: bool = parent.in_table if parent else False
+        self.nesting: int = parent.nesting if parent else 1
+        self.starred = False
+        self.first = True
+
+
+class _Row(NamedTuple):
+    left: int
+    borders: List[int]
+    merges: List[Optional[str]]
+    cells: List[str]
+
+
+class RtfParser:
+    """
+    Reads the paragraphs and top-level table rows of an RTF file in one pass,
+    without building a document. Text in skipped destinations (fonts,
+    styles, pictures, headers, footers, field instructions) is left out,
+    nested tables are not part of their cell, like in the DOCX reader.
+
+    Like python-docx's row.cells, a cell is repeated for every grid column
+    it covers, so template column indices pick the same cell as in the DOCX
+    reader. The grid columns are between the cell borders of all rows, so
+    the rows of a table are handed out once the table ends.
+    """
+
+    def __init__(self) -> None:
+        self.encoding = "cp1252"
+        self.group = _Group()
+        self.groups: List[_Group] = []
+        self.paragraph: List[str] = []
+        self.pending_bytes = bytearray()
+        self.skip_fallback = 0
+
+        self.table_index = -1
+        self.table_open = False
+        self.cell_paragraphs: List[str] = []
+        self.row_cells: List[str] = []
+        self.row_merges: List[Optional[str]] = []
+        self.pending_merge: Optional[str] = None
+        # Left border of the row and right border of every cell, in twips
+        self.row_left = 0
+        self.row_borders: List[int] = []
+        self.table_rows: List[_Row] = []
+
+        # Paragraphs and rows that are finished, handed out by parse
+        self.events: List[Tuple[str, Any]] = []
+
+    def parse(self, source: Union[str, IO[bytes]]) -> Iterator[Tuple[str, Any]]:
+        """
+        Yields ("paragraph", text) for every paragraph, including those in
+        table cells, and ("row", (table index, cells)) for every row of a
+        top-level table, in document order.
+        """
+        if isinstance(source, str):
+            with open(source, "rb") as file:
+                yield from self.parse(file)
+            return
+
+        buffer = source.read(max(CHUNK_SIZE, _LOOKAHEAD))
+        if not buffer.lstrip().startswith(b"{\\rtf"):
+            raise RtfError("Not an RTF file")
+
+        position = 0
+        eof = False
+        while True:
+            limit = len(buffer) if eof else len(buffer) - _LOOKAHEAD
+            while position < limit:
+                match = _TOKEN.match(buffer, position)
+                if match is None:
+                    raise RtfError(f"Unexpected data at byte {position}")
+                position = match.end()
+                binary = self.token(match)
+                if binary:
+                    # \binN is followed by N raw bytes
+                    while len(buffer) - position < binary and not eof:
+                        more = source.read(CHUNK_SIZE)
+                        eof = not more
+                        buffer = buffer[position:] + more
+                        position = 0
+                    position += binary
+                if self.events:
+                    yield from self.events
+                    self.events.clear()
+            if eof:
+                break
+            more = source.read(CHUNK_SIZE)
+            eof = not more
+            buffer = buffer[position:] + more
+            position = 0
+
+        self.flush_bytes()
+        if self.paragraph or self.cell_paragraphs:
+            self.end_paragraph()
+        self.end_table()
+        yield from self.events
+        self.events.clear()
+
+    def token(self, match: "re.Match[bytes]") -> int:
+        word, parameter, hex_byte, symbol, brace, text = match.groups()
+        group = self.group
+
+        if brace is not None:
+            self.flush_bytes()
+            if brace == b"{":
+                self.groups.append(group)
+                self.group = _Group(group)
+            elif self.groups:
+                self.group = self.groups.pop()
+            return 0
+
+        if hex_byte is not None:
+            if group.skip:
+                return 0
+            group.first = False
+            if self.skip_fallback:
+                self.skip_fallback -= 1
+                return 0
+            self.pending_bytes.append(int(hex_byte, 16))
+            return 0
+
+        if text is not None:
+            if group.skip:
+                return 0
+            group.first = False
+            if self.skip_fallback:
+                skipped = min(self.skip_fallback, len(text))
+                self.skip_fallback -= skipped
+                text = text[skipped:]
+            self.pending_bytes.extend(text)
+            return 0
+
+        if word is None and symbol is None:
+            # Line breaks in the file are not text
+            return 0
+
+        self.flush_bytes()
+        self.skip_fallback = 0
+        if symbol is not None:
+            name = symbol.decode("latin-1")
+            if name == "*":
+                group.starred = True
+                return 0
+            if name not in "\r\n":
+                group.first = False
+                if not group.skip and name in CONTROL_SYMBOLS:
+                    self.paragraph.append(CONTROL_SYMBOLS[name])
+                return 0
+            # A backslash before a line break is a paragraph
+            word_name, value = "par", None
+        else:
+            word_name = word.decode("ascii")
+            value = int(parameter) if parameter is not None else None
+
+        first = group.first
+        group.first = False
+        if first and (group.starred or word_name in SKIPPED_DESTINATIONS):
+            group.skip = True
+        if word_name == "bin":
+            return value or 0
+        if group.skip:
+            return 0
+        self.control_word(word_name, value)
+        return 0
+
+    def control_word(self, word: str, value: Optional[int]) -> None:
+        group = self.group
+        if word in SYMBOLS:
+            self.paragraph.append(SYMBOLS[word])
+        elif word == "u" and value is not None:
+            self.paragraph.append(chr(value % 65536))
+            self.skip_fallback = group.uc
+        elif word == "uc" and value is not None:
+            group.uc = value
+        elif word in CODE_PAGES:
+            self.encoding = CODE_PAGES[word]
+        elif word == "ansicpg" and value:
+            try:
+                self.encoding = codecs.lookup(f"cp{value}").name
+            except LookupError:
+                logger.debug("Unknown RTF code page %d", value)
+        elif word in ("par", "sect"):
+            self.end_paragraph()
+        elif word == "pard":
+            group.in_table = False
+            group.nesting = 1
+        elif word == "intbl":
+            group.in_table = True
+        elif word == "itap" and value is not None:
+            group.nesting = value
+            group.in_table = value > 0
+        elif word == "cell":
+            self.end_cell()
+        elif word in ("nestcell", "nestrow"):
+            # Nested tables are not part of the cell text
+            self.paragraph.clear()
+        elif word == "row":
+            self.end_row()
+        elif word == "trowd":
+            self.row_merges = []
+            self.pending_merge = None
+            self.row_left = 0
+            self.row_borders = []
+        elif word == "trleft" and value is not None:
+            self.row_left = value
+        elif word in ("clvmrg", "clmrg"):
+            self.pending_merge = word
+        elif word == "cellx" and value is not None:
+            self.row_merges.append(self.pending_merge)
+            self.row_borders.append(value)
+            self.pending_merge = None
+
+    def flush_bytes(self) -> None:
+        if self.pending_bytes:
+            self.paragraph.append(
+                self.pending_bytes.decode(self.encoding, errors="replace")
+            )
+            self.pending_bytes.clear()
+
+    def paragraph_text(self) -> str:
+        text = "".join(self.paragraph)
+        self.paragraph.clear()
+        if any("\ud800" <= char <= "\udfff" for char in text):
+            # Characters outside the BMP come as two \u surrogates
+            text = text.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+        return text
+
+    def end_paragraph(self) -> None:
+        text = self.paragraph_text()
+        group = self.group
+        if group.in_table:
+            if group.nesting <= 1:
+                self.cell_paragraphs.append(text)
+                self.events.append(("paragraph", text))
+            return
+        # The first paragraph outside a table ends it
+        self.end_table()
+        self.events.append(("paragraph", text))
+
+    def end_cell(self) -> None:
+        if self.group.nesting > 1:
+            self.paragraph.clear()
+            return
+        text = self.paragraph_text()
+        self.events.append(("paragraph", text))
+        self.cell_paragraphs.append(text)
+        self.row_cells.append("\n".join(self.cell_paragraphs))
+        self.cell_paragraphs = []
+        if not self.table_open:
+            self.table_open = True
+            self.table_index += 1
+
+    def end_row(self) -> None:
+        if not self.row_cells:
+            return
+        self.table_rows.append(
+            _Row(
+                self.row_left,
+                list(self.row_borders),
+                list(self.row_merges),
+                self.row_cells,
+            )
+        )
+        self.row_cells = []
+
+    def end_table(self) -> None:
+        """
+        Hands out the rows of the table with the text of every grid column,
+        like docx_tables.row_cells. A vertically merged cell has the text of
+        the cell above, a horizontally merged one that of the cell before.
+        """
+        self.table_open = False
+        rows = self.table_rows
+        self.table_rows = []
+        borders = sorted(
+            {border for row in rows for border in [row.left, *row.borders]}
+        )
+
+        # Texts of the previous row by grid column
+        above: Dict[int, str] = {}
+        for row in rows:
+            column = bisect_left(borders, row.left)
+            cells: List[str] = []
+            texts: Dict[int, str] = {}
+            for index, text in enumerate(row.cells):
+                span = 1
+                if index < len(row.borders):
+                    span = max(bisect_left(borders, row.borders[index]) - column, 1)
+                merge = row.merges[index] if index < len(row.merges) else None
+                if merge == "clvmrg":
+                    text = above.get(column, "")
+                elif merge == "clmrg" and cells:
+                    text = cells[-1]
+                cells.extend([text] * span)
+                texts[column] = text
+                column += span
+            above = texts
+            self.events.append(("row", (self.table_index, cells)))
+
+
+def read_text(source: Union[str, IO[bytes]]) -> str:
+    """
+    Returns the paragraphs of the document, one per line.
+    """
+    return "".join(
+        f"{text}\n" for kind, text in RtfParser().parse(source) if kind == "paragraph"
+    )
+
+
+def iter_table_rows(
+    source: Union[str, IO[bytes]], tables: Optional[Set[int]] = None
+) -> Iterator[Tuple[int, List[str]]]:
+    """
+    Yields (table index, cells) for every row of the top-level tables, or
+    only of the given tables, like docx_tables.iter_table_rows.
+    """
+    for kind, value in RtfParser().parse(source):
+        if kind != "row":
+            continue
+        table_index, cells = value
+        if tables is not None and table_index > max(tables, default=-1):
+            return
+        if tables is None or table_index in tables:
+            yield table_index, cells
@@ -0,0 +1,96 @@
+import logging
+import os
+import sqlite3
+import threading
+from typing import Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+C = TypeVar("C", bound="SqliteCache")
+
+
+class SqliteCache:
+    """
+    A table in an SQLite file that is shared between threads, and between
+    processes in batch checks. Every row has a key and the time it was last
+    used. The least recently used rows are removed once the cost of all rows
+    is more than limit, where cost is an SQL expression: 1 counts rows.
+    """
+
+    table = ""
+    columns = ""
+    cost = "1"
+
+    def __init__(self, path: str, limit: int) -> None:
+        self.path = path
+        self.limit = limit
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        # Batch checks share the file between processes, so wait for locks
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            f"key TEXT PRIMARY KEY, {self.columns}, last_used REAL NOT NULL)"
+        )
+        self._connection.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_last_used "
+            f"ON {self.table} (last_used)"
+        )
+        self._connection.commit()
+
+    def _total(self) -> int:
+        (total,) = self._connection.execute(
+            f"SELECT COALESCE(SUM({self.cost}), 0) FROM {self.table}"
+        ).fetchone()
+        return total
+
+    def _evict(self) -> None:
+        total = self._total()
+        if total <= self.limit:
+            return
+
+        # Remove a bit more than needed, so not every insert has to evict
+        excess = total - int(self.limit * 0.9)
+        self._connection.execute(
+            f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM "
+            f"(SELECT key, {self.cost} AS cost, SUM({self.cost}) OVER "
+            f"(ORDER BY last_used, key) AS removed FROM {self.table}) "
+            "WHERE removed - cost < ?)",
+            (excess,),
+        )
+
+    def total(self) -> int:
+        with self._lock:
+            return self._total()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute(f"DELETE FROM {self.table}")
+            self._connection.commit()
+            self._connection.execute("VACUUM")
+            self.hits = 0
+            self.misses = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def open_sqlite_cache(
+    factory: Callable[[str, int], C], path: Optional[str], limit: int, name: str
+) -> Optional[C]:
+    """
+    Opens a cache, or returns None if it cannot be opened so everything still
+    works without it.
+    """
+    if not path:
+        return None
+    try:
+        # The config directory only exists once the settings were saved
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        return factory(path, limit)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Error opening %s %s: %s", name, path, e)
+        return None
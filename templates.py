@@ -0,0 +1,165 @@
+import json
+import logging
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bilingual table layouts of the CAT tools, "row" is the index of the table.
+# "tables" reads several tables with the same layout instead, the ID and
+# status columns are optional.
+templates: List[Dict[str, Any]] = [
+    {
+        "name": "Smartcat",
+        "simple": False,
+        "row": 0,
+        "id_col_index": 0,
+        "source_col_index": 1,
+        "target_col_index": 2,
+    },
+    {
+        "name": "MemoQ",
+        "simple": False,
+        "row": 0,
+        "id_col_index": 0,
+        "source_col_index": 1,
+        "target_col_index": 2,
+        "status_col_index": 4,
+    },
+    {
+        "name": "Memsouce",
+        "simple": False,
+        "row": 0,
+        "id_col_index": 0,
+        "source_col_index": 3,
+        "target_col_index": 4,
+    },
+    {
+        "name": "Target General",
+        "simple": True,
+    },
+]
+
+# Columns a template can read, in the order of SegmentPair
+COLUMNS = ("source", "target", "id", "status")
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class SegmentPair(NamedTuple):
+    source: str
+    target: str
+    id: str = ""
+    status: str = ""
+
+
+class ExtractionPlan:
+    """
+    The tables and columns a table template reads, compiled once so all
+    columns of a row are taken in the same pass over the document.
+    """
+
+    def __init__(self, tables: List[int], columns: Dict[str, int]) -> None:
+        self.tables = sorted(set(tables))
+        self.columns = columns
+        self._indexes = [columns.get(name) for name in COLUMNS]
+
+    def read(self, rows: Iterable[Tuple[int, List[str]]]) -> List[SegmentPair]:
+        """
+        Returns a pair for every row of the planned tables that has the target
+        column, with the stripped cell texts. Missing optional columns are
+        empty.
+        """
+        tables = set(self.tables)
+        target_index = self.columns["target"]
+        pairs: List[SegmentPair] = []
+        rows_read = 0
+
+        for table, cells in rows:
+            if table not in tables:
+                continue
+            rows_read += 1
+            if target_index >= len(cells):
+                continue
+            pairs.append(
+                SegmentPair(
+                    *(
+                        cells[index].strip()
+                        if index is not None and index < len(cells)
+                        else ""
+                        for index in self._indexes
+                    )
+                )
+            )
+            if rows_read % 1000 == 0:
+                logger.debug("Read %d rows of tables %s", rows_read, self.tables)
+
+        if not rows_read:
+            raise IndexError(f"Tables {self.tables} not found")
+        return pairs
+
+
+def compile_template(template: Dict[str, Any]) -> Optional[ExtractionPlan]:
+    """
+    Returns the extraction plan of a table template, None for simple ones.
+    """
+    if template.get("simple", True):
+        return None
+    tables = template.get("tables", [template.get("row", 0)])
+    columns = {
+        name: template[f"{name}_col_index"]
+        for name in COLUMNS
+        if template.get(f"{name}_col_index") is not None
+    }
+    return ExtractionPlan(tables, columns)
+
+
+def validate_template(template: Any) -> Dict[str, Any]:
+    if not isinstance(template, dict) or not isinstance(template.get("name"), str):
+        raise TemplateError("A template needs a name")
+    if template.get("simple", True):
+        return template
+
+    name = template["name"]
+    for key in ("source_col_index", "target_col_index"):
+        if not isinstance(template.get(key), int):
+            raise TemplateError(f"Template {name} needs {key}")
+    for key in ("row", "id_col_index", "status_col_index"):
+        value = template.get(key)
+        if value is not None and not isinstance(value, int):
+            raise TemplateError(f"{key} of template {name} is not a number")
+    tables = template.get("tables")
+    if tables is not None and (
+        not isinstance(tables, list)
+        or not tables
+        or not all(isinstance(table, int) for table in tables)
+    ):
+        raise TemplateError(f"tables of template {name} is not a list of numbers")
+    return template
+
+
+def load_templates(path: str) -> List[Dict[str, Any]]:
+    """
+    Adds the templates of a JSON file, a list of objects like the ones above.
+    A template with the name of an existing one replaces it.
+    """
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    if not isinstance(data, list):
+        raise TemplateError(f"{path} does not contain a list of templates")
+
+    loaded = [validate_template(template) for template in data]
+    for template in loaded:
+        existing = find_template(template["name"])
+        if existing is None:
+            templates.append(template)
+        else:
+            templates[templates.index(existing)] = template
+    return loaded
+
+
+def find_template(name: str) -> Optional[Dict[str, Any]]:
+    return next(
+        (template for template in templates if template["name"] == name), None
+    )
@@ -0,0 +1,130 @@
+import threading
+from typing import Any, List
+
+import pytest
+
+from benchmarks.stub_checker import StubChecker
+from check_engine import CheckStats, Segment, check_segments, split_segments
+from markup import strip_segments
+from match_cache import MatchCache
+from match_store import MatchRecord
+
+
+class FailingChecker:
+    """
+    Fails every request, like a LanguageTool server that went down.
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def check(self, text: str) -> List[Any]:
+        with self._lock:
+            self.requests += 1
+        raise ConnectionError("server down")
+
+
+def test_failing_checker_stops_the_queued_batches() -> None:
+    segments = [Segment(i * 10, f"Segment {i}") for i in range(200)]
+    checker = FailingChecker()
+
+    with pytest.raises(ConnectionError):
+        check_segments(segments, [checker], workers=2, batch_size=1)
+
+    # Only the batches that were already running were sent
+    assert checker.requests <= 4
+
+
+def repeated_text() -> str:
+    lines: List[str] = []
+    for i in range(40):
+        # Every third line repeats an earlier one
+        lines.append(lines[i // 2] if i % 3 == 2 else f"Line {i} has teh typo")
+    return "\n".join(lines)
+
+
+def test_repeated_segments_are_checked_once() -> None:
+    text = repeated_text()
+    checker = StubChecker()
+    stats = CheckStats()
+
+    matches = check_segments(
+        split_segments(text), [checker], batch_size=50, stats=stats
+    )
+
+    assert [text[record.offset : record.end] for record in matches] == ["teh"] * 40
+    assert len({record.offset for record in matches}) == 40
+    assert stats.repeated == 13
+    assert stats.checked == 27
+    assert checker.characters < sum(len(line) + 1 for line in set(text.split("\n")))
+
+
+def stream(text: str, window_size: int) -> List[List[Segment]]:
+    batches: List[List[Segment]] = []
+
+    def on_batch(segments: List[Segment], matches: List[MatchRecord]) -> None:
+        batches.append(segments)
+        starts = {segment.offset for segment in segments}
+        # Every segment has its own copy of the match, at its own offset
+        assert len(matches) == len(segments)
+        for match in matches:
+            assert text.rfind("\n", 0, match.offset) + 1 in starts
+            assert text[match.offset : match.end] == "teh"
+
+    check_segments(
+        split_segments(text),
+        [StubChecker()],
+        workers=4,
+        batch_size=50,
+        on_batch=on_batch,
+        window_size=window_size,
+    )
+    return batches
+
+
+def test_streamed_batches_are_in_document_order() -> None:
+    batches = stream(repeated_text(), 10000)
+
+    offsets = [segment.offset for batch in batches for segment in batch]
+    assert offsets == sorted(offsets)
+    assert len(offsets) == 40
+
+
+def test_streamed_windows_pass_every_segment_once() -> None:
+    text = repeated_text()
+    batches = stream(text, 200)
+
+    offsets = [segment.offset for batch in batches for segment in batch]
+    assert sorted(offsets) == [segment.offset for segment in split_segments(text)]
+    assert all(batch == sorted(batch) for batch in batches)
+
+
+def test_cache_hits_are_moved_back_across_tags(tmp_path: Any) -> None:
+    text = "\n".join(["Plain teh line", "<b>Tagged</b> teh line", "Plain teh line"] * 3)
+    cache = MatchCache(str(tmp_path / "matches.db"), 1000)
+    expected = None
+
+    for _ in range(2):
+        segments, offset_map = strip_segments(split_segments(text))
+        stats = CheckStats()
+        matches = check_segments(
+            segments,
+            [StubChecker()],
+            cache=cache,
+            stats=stats,
+            offset_map=offset_map,
+            window_size=30,
+        )
+        found = [
+            (record.offset, text[record.offset : record.end]) for record in matches
+        ]
+        assert [covered for _, covered in found] == ["teh"] * 9
+        if expected is None:
+            expected = found
+            assert stats.cached == 0
+        else:
+            assert found == expected
+            assert stats.cached == 2
+            assert stats.checked == 0
+    cache.close()
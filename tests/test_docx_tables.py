@@ -0,0 +1,111 @@
+import zipfile
+
+from docx_tables import iter_table_rows
+from templates import ExtractionPlan, SegmentPair
+
+# The expected cells are those of python-docx 1.2 row.cells for the same XML
+
+NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def paragraph(*runs: str) -> str:
+    return f"<w:p>{''.join(runs)}</w:p>"
+
+
+def run(text: str) -> str:
+    return f'<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
+
+
+def cell(*content: str, properties: str = "") -> str:
+    return f"<w:tc><w:tcPr>{properties}</w:tcPr>{''.join(content)}</w:tc>"
+
+
+def row(*cells: str, properties: str = "") -> str:
+    return f"<w:tr><w:trPr>{properties}</w:trPr>{''.join(cells)}</w:tr>"
+
+
+def table(*rows: str) -> str:
+    return f"<w:tbl>{''.join(rows)}</w:tbl>"
+
+
+BODY = (
+    paragraph(run("Before the tables"))
+    + table(
+        row(
+            cell(
+                paragraph(run("Merged")),
+                properties='<w:gridSpan w:val="2"/><w:vMerge w:val="restart"/>',
+            ),
+            cell(
+                paragraph(run("First")),
+                paragraph(
+                    run("Second "),
+                    '<w:hyperlink r:id="rId1">' + run("link") + "</w:hyperlink>",
+                ),
+            ),
+            properties='<w:gridBefore w:val="1"/>',
+        ),
+        row(
+            cell(paragraph(), properties='<w:gridSpan w:val="2"/><w:vMerge/>'),
+            cell(
+                paragraph(
+                    "<w:r><w:t>Tab</w:t><w:tab/><w:t>non</w:t>"
+                    "<w:noBreakHyphen/><w:t>breaking</w:t></w:r>"
+                )
+            ),
+            properties='<w:gridBefore w:val="1"/>',
+        ),
+        row(
+            cell(
+                paragraph(run("a")),
+                table(row(cell(paragraph(run("nested"))))),
+            ),
+            cell(paragraph("<w:r><w:t>b</w:t><w:br/><w:t>c</w:t></w:r>")),
+            properties='<w:gridAfter w:val="2"/>',
+        ),
+    )
+    + paragraph(run("Between the tables"))
+    + table(row(cell(paragraph(run(" t1 "))), cell(paragraph(run("target")))))
+)
+
+
+def write_docx(path: str) -> None:
+    document = (
+        f'<w:document xmlns:w="{NAMESPACE}" xmlns:r="http://schemas.openxmlformats'
+        f'.org/officeDocument/2006/relationships"><w:body>{BODY}</w:body>'
+        "</w:document>"
+    )
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", document)
+
+
+def test_rows_match_python_docx_cells(tmp_path):
+    path = str(tmp_path / "tables.docx")
+    write_docx(path)
+
+    assert list(iter_table_rows(path)) == [
+        # gridBefore adds no cell, gridSpan repeats the cell
+        (0, ["Merged", "Merged", "First\nSecond link"]),
+        # vMerge continues the cell above in the same grid column
+        (0, ["Merged", "Merged", "Tab\tnon-breaking"]),
+        # Nested tables are not part of the cell, gridAfter adds no cells
+        (0, ["a", "b\nc"]),
+        (1, [" t1 ", "target"]),
+    ]
+
+
+def test_only_wanted_tables(tmp_path):
+    path = str(tmp_path / "tables.docx")
+    write_docx(path)
+
+    assert list(iter_table_rows(path, {1})) == [(1, [" t1 ", "target"])]
+
+
+def test_plan_pairs_stripped_columns(tmp_path):
+    path = str(tmp_path / "tables.docx")
+    write_docx(path)
+
+    plan = ExtractionPlan([1], {"source": 0, "target": 1})
+    assert plan.read(iter_table_rows(path, set(plan.tables))) == [
+        SegmentPair("t1", "target")
+    ]
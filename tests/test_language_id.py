@@ -0,0 +1,60 @@
+from typing import Dict
+
+import pytest
+
+from check_engine import Segment
+from language_id import OTHER_SCRIPT, STOPWORDS, identify, route_segments
+
+SHORT_SEGMENTS = [
+    ("en", "This is a test."),
+    ("en", "The settings were saved."),
+    ("en", "Are you sure you want to delete this item?"),
+    ("de", "Die Einstellungen wurden gespeichert."),
+    ("de", "Möchten Sie die Datei löschen?"),
+    ("fr", "Ceci est un test."),
+    ("fr", "Voulez-vous supprimer cet élément ?"),
+    ("es", "Haga clic en Guardar para almacenar el archivo."),
+    ("es", "¿Desea eliminar este elemento?"),
+    ("it", "Questo è un test."),
+    ("it", "Vuoi eliminare questo elemento?"),
+    ("nl", "Dit is een test."),
+    ("nl", "Wilt u dit item verwijderen?"),
+    ("pt", "Isto é um teste."),
+    ("pt", "Sua senha expirou."),
+]
+
+
+@pytest.mark.parametrize("language, text", SHORT_SEGMENTS)
+def test_short_segments_are_identified(language: str, text: str) -> None:
+    assert identify(text) == language
+
+
+@pytest.mark.parametrize(
+    "text", ["OK", "Hello", "Max Mustermann", "iPhone 15 Pro", "Version 2.1"]
+)
+def test_names_and_single_words_are_not_identified(text: str) -> None:
+    assert identify(text) is None
+
+
+def test_other_scripts() -> None:
+    assert identify("Настройки сохранены.") == OTHER_SCRIPT
+
+
+def test_no_stopword_belongs_to_two_languages() -> None:
+    languages: Dict[str, str] = {}
+    for language, words in STOPWORDS.items():
+        for word in words.split():
+            assert languages.setdefault(word, language) == language, word
+
+
+def test_route_segments() -> None:
+    segments = [
+        Segment(0, "Die Einstellungen wurden gespeichert."),
+        Segment(40, "The settings were saved."),
+        Segment(70, "Questo è un test."),
+        Segment(90, "OK"),
+    ]
+    groups, skipped = route_segments(segments, "de-DE", ["de-DE", "en-US"])
+
+    assert groups == {"de-DE": [segments[0], segments[3]], "en-US": [segments[1]]}
+    assert skipped == [segments[2]]
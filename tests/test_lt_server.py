@@ -0,0 +1,111 @@
+import logging
+import os
+import socket
+import sys
+import time
+from typing import Callable, Iterator
+
+import pytest
+
+from benchmarks.stub_server import StubServer, start_stub_server
+from lt_server import LanguageToolServer, ServerError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def stub_server() -> Iterator[StubServer]:
+    server = start_stub_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 20) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def test_requests_reuse_the_connection(stub_server: StubServer) -> None:
+    server = LanguageToolServer(stub_server.url, start=False, health_interval=0)
+    checker = server.checker("en-US")
+    connections = stub_server.connections
+
+    matches = [checker.check("I recieve teh mail.") for _ in range(5)]
+
+    assert [[match.rule_id for match in found] for found in matches] == [
+        ["MORFOLOGIK_RULE", "MORFOLOGIK_RULE"]
+    ] * 5
+    assert matches[0][1].offset == 10
+    assert stub_server.connections == connections + 1
+    assert server.version == "stub"
+    server.close()
+
+
+def test_dropped_connection_is_retried(
+    stub_server: StubServer, caplog: pytest.LogCaptureFixture
+) -> None:
+    server = LanguageToolServer(stub_server.url, start=False, health_interval=0)
+    checker = server.checker("en-US")
+    stub_server.keep_alive = False
+
+    checker.check("First request.")
+    # The kept connection was closed by the server in the meantime
+    with caplog.at_level(logging.INFO, logger="lt_server"):
+        matches = checker.check("Second teh request.")
+    assert [match.offset for match in matches] == [7]
+    assert "retrying" in caplog.text
+    assert server.requests == 2
+    server.close()
+
+
+def test_error_answers_raise_server_error(stub_server: StubServer) -> None:
+    server = LanguageToolServer(stub_server.url, start=False, health_interval=0)
+    server.ensure_running()
+    requests = stub_server.requests
+
+    with pytest.raises(ServerError, match="400"):
+        server.request("/v2/check", {"text": "No language"})
+    assert stub_server.requests == requests
+    server.close()
+
+
+def test_server_that_is_not_running_is_not_started_without_start() -> None:
+    server = LanguageToolServer(f"http://127.0.0.1:{free_port()}", start=False)
+
+    with pytest.raises(ServerError, match="not running"):
+        server.checker("en-US")
+
+
+def test_stopped_server_is_restarted(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PYTHONPATH", ROOT)
+    port = free_port()
+    command = [sys.executable, "-m", "benchmarks.stub_server", "--port", str(port)]
+    server = LanguageToolServer(
+        f"http://127.0.0.1:{port}", command=command, health_interval=0.2
+    )
+    try:
+        checker = server.checker("en-US")
+        process = server._process
+        assert process is not None
+
+        process.kill()
+        process.wait()
+        assert wait_for(lambda: server.restarts == 1 and server.is_healthy())
+        assert [match.offset for match in checker.check("teh")] == [0]
+    finally:
+        server.stop()
+
+    assert server._process is None
+    assert process.poll() is not None
+    assert not server.is_healthy()
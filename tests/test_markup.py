@@ -0,0 +1,83 @@
+from benchmarks.stub_checker import StubChecker
+from check_engine import Segment, check_segments, iter_segments, split_segments
+from markup import OffsetMap, iter_stripped, strip_markup, strip_segments
+from match_store import MatchRecord
+
+TEXT = (
+    "<b>teh</b> start is tagged\n"
+    "Please <g id='1'>recieve</g> the {0} file\n"
+    "\n"
+    "A tag at the end of teh<br/>\n"
+    "Two %s spaces  and teh end"
+)
+
+
+def covered(record: MatchRecord) -> str:
+    return TEXT[record.offset : record.end]
+
+
+def test_strip_markup() -> None:
+    text, removals = strip_markup("Click <b>Save</b> to store {0} files")
+
+    assert text == "Click Save to store files"
+    assert removals == [(6, 3), (10, 7), (20, 11)]
+
+
+def test_offset_map_moves_positions_back() -> None:
+    segments, offset_map = strip_segments([Segment(100, "a <x>b</x> c")])
+
+    assert segments == [Segment(100, "a b c")]
+    assert [offset_map.to_original(100 + i) for i in range(5)] == [
+        100,
+        101,
+        105,
+        110,
+        111,
+    ]
+    # A match around removed markup covers it
+    assert offset_map.map_record(MatchRecord(102, 3)).offset == 105
+    assert offset_map.map_record(MatchRecord(100, 5)).length == 12
+
+
+def test_matches_are_moved_back_across_tags() -> None:
+    segments, offset_map = strip_segments(split_segments(TEXT))
+    matches = check_segments(segments, [StubChecker()], offset_map=offset_map)
+
+    assert [(covered(record), record.rule_id) for record in matches] == [
+        ("teh", "MORFOLOGIK_RULE"),
+        ("recieve", "MORFOLOGIK_RULE"),
+        ("teh", "MORFOLOGIK_RULE"),
+        ("  ", "WHITESPACE_RULE"),
+        ("teh", "MORFOLOGIK_RULE"),
+    ]
+
+
+def test_segments_without_markup_keep_their_positions() -> None:
+    segments, offset_map = strip_segments(split_segments("No tags\nteh end"))
+
+    assert len(offset_map) == 0
+    assert offset_map.map_records([MatchRecord(8, 3)])[0].offset == 8
+    assert [segment.text for segment in segments] == ["No tags", "teh end"]
+
+
+def test_positions_after_a_stripped_segment_are_not_shifted() -> None:
+    segments, offset_map = strip_segments([Segment(0, "<b>x</b>"), Segment(9, "teh")])
+
+    assert segments == [Segment(0, "x"), Segment(9, "teh")]
+    assert offset_map.to_original(9) == 9
+
+
+def test_streamed_segments_are_stripped_as_they_are_read() -> None:
+    offset_map = OffsetMap()
+    segments = iter_stripped(iter_segments([TEXT[:30], TEXT[30:]]), offset_map)
+    matches = check_segments(
+        segments, [StubChecker()], offset_map=offset_map, window_size=20
+    )
+
+    assert [covered(record) for record in matches] == [
+        "teh",
+        "recieve",
+        "teh",
+        "  ",
+        "teh",
+    ]
@@ -0,0 +1,33 @@
+from match_store import MatchRecord, MatchStore
+
+
+def offsets(store: MatchStore) -> list:
+    return [(record.offset, record.rule_id) for record in store]
+
+
+def test_edits_move_later_matches_and_drop_touched_ones() -> None:
+    store = MatchStore(
+        MatchRecord(offset, 3, rule_id) for offset, rule_id in [(0, "a"), (10, "b")]
+    )
+    store.add([MatchRecord(20, 3, "c"), MatchRecord(30, 3, "d")])
+
+    # Typing two characters before "b"
+    assert store.edited(5, 0, 1) == 0
+    assert store.edited(6, 0, 1) == 0
+    assert offsets(store) == [(0, "a"), (12, "b"), (22, "c"), (32, "d")]
+
+    # Deleting inside "c", then typing inside "a"
+    assert store.edited(23, 1, 0) == 1
+    assert store.edited(1, 0, 4) == 1
+    assert offsets(store) == [(16, "b"), (35, "d")]
+    assert [record.rule_id for record in store.at(36)] == ["d"]
+    assert store.index_of(17) == 1
+
+
+def test_matches_added_after_edits_are_sorted_in() -> None:
+    store = MatchStore([MatchRecord(10, 2, "a"), MatchRecord(40, 2, "b")])
+    store.edited(0, 0, 5)
+
+    assert not store.add([MatchRecord(30, 2, "c")])
+    assert offsets(store) == [(15, "a"), (30, "c"), (45, "b")]
+    assert store.at(46)[0].rule_id == "b"
@@ -0,0 +1,56 @@
+import io
+
+from rtf_reader import iter_table_rows, read_text
+
+# The expected cells are those docx_tables.iter_table_rows returns for the
+# same table saved as DOCX
+
+RTF = rb"""{\rtf1\ansi\deff0
+{\fonttbl{\f0 Arial;}}
+Before the table\par
+\trowd\cellx2000\cellx4000\cellx6000
+\intbl A1\cell B1\cell C1\cell\row
+\trowd\cellx4000\cellx6000
+\intbl Wide\cell C2\cell\row
+\trowd\clmgf\cellx2000\clmrg\cellx4000\clvmrg\cellx6000
+\intbl Merged\cell\cell\cell\row
+\trowd\trleft2000\cellx4000\cellx6000
+\intbl Indented\cell C4\cell\row
+\pard Between the tables\par
+\trowd\cellx3000
+\intbl Second\cell\row
+\pard After the tables\par
+}"""
+
+
+def test_cells_are_repeated_for_every_grid_column() -> None:
+    assert list(iter_table_rows(io.BytesIO(RTF))) == [
+        (0, ["A1", "B1", "C1"]),
+        (0, ["Wide", "Wide", "C2"]),
+        (0, ["Merged", "Merged", "C2"]),
+        (0, ["Indented", "C4"]),
+        (1, ["Second"]),
+    ]
+
+
+def test_only_the_wanted_tables_are_read() -> None:
+    assert list(iter_table_rows(io.BytesIO(RTF), {1})) == [(1, ["Second"])]
+
+
+def test_read_text() -> None:
+    assert read_text(io.BytesIO(RTF)).splitlines() == [
+        "Before the table",
+        "A1",
+        "B1",
+        "C1",
+        "Wide",
+        "C2",
+        "Merged",
+        "",
+        "",
+        "Indented",
+        "C4",
+        "Between the tables",
+        "Second",
+        "After the tables",
+    ]
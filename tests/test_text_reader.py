@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import pytest
+
+from check_engine import iter_segments, split_segments
+from text_reader import iter_text_chunks
+
+TEXT = "First line\nSecond teh line\n\n  Indented\nÜmlaut and € sign\nLast"
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n", "\r"])
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-16"])
+def test_chunks_of_any_size_join_to_the_text(
+    tmp_path: Path, newline: str, encoding: str
+) -> None:
+    path = tmp_path / "text.txt"
+    path.write_bytes(TEXT.replace("\n", newline).encode(encoding))
+
+    for chunk_size in range(1, 24):
+        chunks = list(iter_text_chunks(str(path), chunk_size))
+        assert "".join(chunks) == TEXT, chunk_size
+        assert list(iter_segments(chunks)) == split_segments(TEXT), chunk_size
+
+
+def test_a_line_without_breaks_is_handed_out_in_pieces(tmp_path: Path) -> None:
+    path = tmp_path / "line.txt"
+    path.write_text("x" * 1000, encoding="utf-8")
+
+    chunks = list(iter_text_chunks(str(path), 100))
+
+    assert [len(chunk) for chunk in chunks] == [100] * 10
+    assert list(iter_segments(chunks)) == split_segments("x" * 1000)
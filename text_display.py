@@ -1,24 +1,52 @@
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QMouseEvent
-from PySide6.QtWidgets import QApplication, QTextEdit
+from typing import List, Optional
+
+from PySide6.QtCore import QEvent, QPoint, Qt, Signal
+from PySide6.QtGui import QHelpEvent, QMouseEvent
+from PySide6.QtWidgets import QApplication, QTextEdit, QToolTip
+
+from match_store import MatchRecord, MatchStore
 
 
 class TextDisplay(QTextEdit):
+    errorClicked = Signal(int)
+
     def __init__(self):
         super().__init__()
+        self.match_store: Optional[MatchStore] = None
+
+    def errorsAt(self, point: QPoint) -> List[MatchRecord]:
+        if self.match_store is None:
+            return []
+        position = self.cursorForPosition(point).position()
+        return self.match_store.at(position)
+
+    def viewportEvent(self, e: QEvent) -> bool:
+        # Tooltips come from the match store instead of the character formats
+        if e.type() == QEvent.Type.ToolTip and isinstance(e, QHelpEvent):
+            errors = self.errorsAt(e.pos())
+            if errors:
+                QToolTip.showText(
+                    e.globalPos(),
+                    "\n\n".join(error.tooltip() for error in errors),
+                    self,
+                )
+            else:
+                QToolTip.hideText()
+                e.ignore()
+            return True
+        return super().viewportEvent(e)
 
     def mouseMoveEvent(self, e: QMouseEvent):
-        self.anchor = self.anchorAt(e.position().toPoint())
-        if self.anchor:
+        if self.errorsAt(e.position().toPoint()):
             QApplication.setOverrideCursor(Qt.CursorShape.PointingHandCursor)
         else:
             QApplication.setOverrideCursor(Qt.CursorShape.ArrowCursor)
 
     def mousePressEvent(self, e: QMouseEvent):
-        self.anchor = self.anchorAt(e.position().toPoint())
+        errors = self.errorsAt(e.position().toPoint())
 
-        if self.anchor:
-            print(f"Anchor: {self.anchor}")
+        if errors:
+            self.errorClicked.emit(errors[0].offset)
 
         # if self.anchor:
         #     QApplication.setOverrideCursor(Qt.CursorShape.PointingHandCursor)
@@ -1,32 +1,72 @@
-import re
-from typing import Any, Dict
-
-import language_tool_python  # type: ignore
-from colorama import Fore, Style  # type: ignore
-from PySide6.QtCore import QEvent, QObject, QSettings, Qt
+import logging
+import os
+import shlex
+import threading
+from bisect import bisect_right
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from PySide6.QtCore import (
+    QEvent,
+    QModelIndex,
+    QObject,
+    QSettings,
+    Qt,
+    QThread,
+    QTimer,
+    Signal,
+)
 from PySide6.QtGui import (
     QAction,
-    QColor,
-    QFont,
-    QTextCharFormat,
     QTextCursor,
     QTextDocument,
 )
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QCheckBox,
     QComboBox,
     QFileDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
     QMainWindow,
+    QProgressBar,
     QSplitter,
     QStyle,
-    QTextEdit,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
 )
 
+from check_engine import Segment, split_segments
+from check_worker import CheckWorker
+from checker_pool import CheckerPool
+from error_highlighter import ErrorHighlighter
+from error_list_model import ErrorListModel
 from file_loader_worker import FileLoaderWorker
+from extraction_cache import open_extraction_cache
+from file_handler import FileHandler, is_plain_text
+from file_scheduler import DONE, FAILED, FileJob, FileScheduler
+from language_id import check_languages, route_segments
+from lt_server import LanguageToolServer
+from markup import OffsetMap, strip_segments
+from match_cache import open_cache
+from match_store import MatchRecord, MatchStore
+from templates import find_template, load_templates
 from text_display import TextDisplay
+from timing import span, timings
+
+logger = logging.getLogger(__name__)
+
+# Block user state for paragraphs edited since the last check
+DIRTY_BLOCK = 1
 
 
 class TextEditor(QMainWindow):
+    # Emitted from the scheduler threads with the file name
+    projectFileChanged = Signal(str)
+
     def __init__(self) -> None:
         super().__init__()
         self.recentFiles: list[str] = []
@@ -37,6 +77,14 @@ class TextEditor(QMainWindow):
         self.splitter.setOrientation(Qt.Orientation.Horizontal)
         self.setCentralWidget(self.splitter)
 
+        # Files opened together, with their status, shown once there are any
+        self.project_list = QListWidget()
+        self.project_list.currentItemChanged.connect(self.projectFileSelected)
+        self.project_list.hide()
+        self.splitter.addWidget(self.project_list)
+        self.project_items: Dict[str, QListWidgetItem] = {}
+        self.shown_project_file = ""
+
         self.text_display = TextDisplay()
         self.text_display.setAcceptRichText(True)
         self.text_display.setStyleSheet("background-color: white; color: black;")
@@ -44,25 +92,59 @@ class TextEditor(QMainWindow):
             Qt.TextInteractionFlag.TextEditorInteraction
         )
         self.splitter.addWidget(self.text_display)
+        # Errors are underlined only near the viewport
+        self.highlighter = ErrorHighlighter(
+            self.text_display, lambda text: self.block_errors.get(text)
+        )
+        # track edited paragraphs for incremental checks
+        self.watchDocument(self.text_display.document())
         # allow handling clicks / Escape to clear selection
         self.text_display.installEventFilter(self)
         # track mouse press to distinguish click vs drag
         self._mouse_press_pos = None
         self._mouse_moved = False
 
-        self.error_display = QTextEdit()
-        self.error_display.setAcceptRichText(True)
-        self.error_display.setReadOnly(True)
-        self.splitter.addWidget(self.error_display)
+        # Error list with category and rule/message filters
+        error_panel = QWidget()
+        error_layout = QVBoxLayout(error_panel)
+        error_layout.setContentsMargins(0, 0, 0, 0)
 
-        self.error_display.setText("Errors will be displayed here.")
+        filter_layout = QHBoxLayout()
+        self.error_category_combo_box = QComboBox()
+        self.error_category_combo_box.addItem("All categories")
+        self.error_category_combo_box.currentIndexChanged.connect(
+            self.errorFilterChanged
+        )
+        filter_layout.addWidget(self.error_category_combo_box)
+
+        self.error_filter_edit = QLineEdit()
+        self.error_filter_edit.setPlaceholderText("Filter by rule or message")
+        self.error_filter_edit.textChanged.connect(self.errorFilterChanged)
+        filter_layout.addWidget(self.error_filter_edit)
+        error_layout.addLayout(filter_layout)
+
+        self.error_model = ErrorListModel(self)
+        self.error_view = QTableView()
+        self.error_view.setModel(self.error_model)
+        self.error_view.setSortingEnabled(True)
+        self.error_view.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+        self.error_view.setSelectionBehavior(
+            QAbstractItemView.SelectionBehavior.SelectRows
+        )
+        self.error_view.setSelectionMode(
+            QAbstractItemView.SelectionMode.SingleSelection
+        )
+        self.error_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.error_view.verticalHeader().hide()
+        # Rows all have the same height, so the view does not measure each row
+        self.error_view.verticalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Fixed
+        )
+        self.error_view.horizontalHeader().setStretchLastSection(True)
+        self.error_view.clicked.connect(self.errorSelected)
+        error_layout.addWidget(self.error_view)
 
-        cursor = QTextCursor(self.error_display.document())
-        cursor.setPosition(0)
-        cursor.insertHtml("<b>")
-        # cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.KeepAnchor, 5)
-        cursor.setPosition(5)
-        cursor.insertHtml("</b>")
+        self.splitter.addWidget(error_panel)
 
         # Load recent files from QSettings
         recent_files = QSettings().value("recentFiles", [])
@@ -70,6 +152,8 @@ class TextEditor(QMainWindow):
         # Check if this is a list of strings or a single string
         if isinstance(recent_files, str):
             self.recentFiles = [recent_files]
+        elif isinstance(recent_files, list):
+            self.recentFiles = [str(file_name) for file_name in recent_files]
 
         open_action = QAction("Open", self)
         open_action.setShortcut("Ctrl+O")
@@ -79,6 +163,14 @@ class TextEditor(QMainWindow):
         )
         open_action.triggered.connect(self.openFile)
 
+        open_files_action = QAction("Open Files...", self)
+        open_files_action.setStatusTip("Load and check several files")
+        open_files_action.triggered.connect(self.openFiles)
+
+        check_recent_files_action = QAction("Check Recent Files", self)
+        check_recent_files_action.setStatusTip("Load and check all recent files")
+        check_recent_files_action.triggered.connect(self.checkRecentFiles)
+
         exit_action = QAction("Exit", self)
         exit_action.triggered.connect(self.close)
 
@@ -86,6 +178,14 @@ class TextEditor(QMainWindow):
         check_action.setShortcut("F5")
         check_action.triggered.connect(self.checkText)
 
+        cancel_check_action = QAction("Cancel Check", self)
+        cancel_check_action.setShortcut("Shift+F5")
+        cancel_check_action.triggered.connect(self.cancelCheck)
+
+        clear_cache_action = QAction("Clear Match Cache", self)
+        clear_cache_action.setStatusTip("Forget all stored LanguageTool results")
+        clear_cache_action.triggered.connect(self.clearMatchCache)
+
         clear_action = QAction("Clear Text", self)
         clear_action.setShortcut("F6")
         clear_action.triggered.connect(self.text_display.clear)
@@ -102,19 +202,28 @@ class TextEditor(QMainWindow):
         menubar = self.menuBar()
         file_menu = menubar.addMenu("File")
         file_menu.addAction(open_action)
+        file_menu.addAction(open_files_action)
         file_menu.addAction(open_latest_recent_file_action)
+        file_menu.addAction(check_recent_files_action)
 
         self.recentMenu = file_menu.addMenu("Recent Files")
         self.updateRecentFilesMenu()
 
         file_menu.addAction(check_action)
+        file_menu.addAction(cancel_check_action)
         file_menu.addAction(clear_action)
+        file_menu.addAction(clear_cache_action)
         file_menu.addSeparator()
 
         preferences_action = QAction("Preferences", self)
         preferences_action.triggered.connect(self.openPreferences)
 
         file_menu.addAction(preferences_action)
+
+        diagnostics_action = QAction("Diagnostics", self)
+        diagnostics_action.setStatusTip("Show how long loading and checking took")
+        diagnostics_action.triggered.connect(self.openDiagnostics)
+        file_menu.addAction(diagnostics_action)
         file_menu.addSeparator()
         file_menu.addAction(exit_action)
 
@@ -122,14 +231,20 @@ class TextEditor(QMainWindow):
 
         self.statusBar()
 
+        self.check_progress_bar = QProgressBar()
+        self.check_progress_bar.setMaximumWidth(200)
+        self.check_progress_bar.hide()
+        self.statusBar().addPermanentWidget(self.check_progress_bar)
+
         # Add an icon bar
         self.toolbar = self.addToolBar("Toolbar")
         self.addToolBar(Qt.ToolBarArea.TopToolBarArea, self.toolbar)
         self.toolbar.addAction(open_action)
 
-        # Add template dropdown
+        # Add template dropdown, with the templates of the user
         from pyLanguageTool import templates
 
+        self.loadUserTemplates()
         self.template_combo_box = QComboBox()
         self.template_combo_box.addItems(
             [str(template["name"]) for template in templates]
@@ -141,6 +256,10 @@ class TextEditor(QMainWindow):
         self.remove_tags_check_box = QCheckBox("Remove tags")
         self.toolbar.addWidget(self.remove_tags_check_box)
 
+        # Check every paragraph in its own language, skip other languages
+        self.detect_languages_check_box = QCheckBox("Detect languages")
+        self.toolbar.addWidget(self.detect_languages_check_box)
+
         # Add language selection dropdown
         self.language_combo_box = QComboBox()
         self.language_codes = {
@@ -152,6 +271,7 @@ class TextEditor(QMainWindow):
         }
         self.language_combo_box.addItems(list(self.language_codes.keys()))
         self.language_combo_box.setCurrentText("German (de-DE)")
+        self.language_combo_box.currentIndexChanged.connect(self.languageChanged)
         self.toolbar.addWidget(self.language_combo_box)
 
         # Maximize the window
@@ -162,29 +282,115 @@ class TextEditor(QMainWindow):
 
         self.show()
 
-        # Initialize with default language
-        self.language_tool = language_tool_python.LanguageTool(
-            self.language_codes[self.language_combo_box.currentText()]
+        # Checkers are started on first use and kept warm until they are idle
+        # for too long
+        settings = QSettings()
+        # With a server URL all windows share one LanguageTool server instead
+        # of starting their own
+        self.lt_server: Optional[LanguageToolServer] = None
+        server_url = settings.value("checker/serverUrl", "")
+        if server_url:
+            server_command = settings.value("checker/serverCommand", "")
+            self.lt_server = LanguageToolServer(
+                server_url,
+                command=shlex.split(server_command) if server_command else None,
+                max_connections=int(settings.value("checker/maxConnections", 4)),
+            )
+        self.checker_pool = CheckerPool(
+            idle_timeout=float(settings.value("checker/idleTimeout", 600)),
+            max_instances=int(settings.value("checker/maxInstances", 3)),
+            memory_limit_mb=int(settings.value("checker/memoryLimitMB", 0)),
+            factory=self.lt_server.checker if self.lt_server else None,
+        )
+        # Start the selected language once the window is painted, checks
+        # requested before it is ready wait for it in the worker
+        QTimer.singleShot(0, self.warmUpChecker)
+
+        # Matches of checked segments are kept between sessions
+        config_dir = os.path.dirname(QSettings().fileName())
+        self.match_cache = open_cache(
+            os.path.join(config_dir, "match_cache.sqlite"),
+            int(settings.value("cache/maxEntries", 200000)),
+        )
+        # Text extracted from files, so recent files open without parsing
+        self.extraction_cache = open_extraction_cache(
+            os.path.join(config_dir, "extraction_cache.sqlite"),
+            int(settings.value("cache/extractionMaxMB", 200)) * 1024 * 1024,
         )
+        if settings.value("cache/prefetchRecentFile", True) not in (False, "false"):
+            QTimer.singleShot(0, self.prefetchRecentFile)
+
+        # Opened files are loaded and checked in the background, the shown
+        # one first
+        self.file_scheduler = FileScheduler(
+            self.loadProjectFile,
+            self.checkProjectFile,
+            workers=int(settings.value("project/workers", 2)),
+            on_status=lambda job: self.projectFileChanged.emit(job.file_name),
+        )
+        self.projectFileChanged.connect(self.updateProjectFile)
+
+        self.evict_timer = QTimer(self)
+        self.evict_timer.timeout.connect(self.checker_pool.evict_idle)
+        self.evict_timer.start(60 * 1000)
+
+        self.match_store = MatchStore()
+        self.text_display.match_store = self.match_store
+        self.error_categories: Set[str] = set()
+        self.text_display.errorClicked.connect(self.errorClicked)
+
+        # Every check gets a new generation, results of older checks are dropped
+        self.check_generation = 0
+        self.checkWorker: Optional[CheckWorker] = None
+        self.running_workers: List[QThread] = []
+        self.pending_check: Dict[str, Any] = {}
 
-        self.errors: Dict[int, Dict[str, Any]] = {}
+        # Errors of checked paragraphs, relative to the paragraph start and keyed
+        # by paragraph text, so unchanged paragraphs are not checked again
+        self.block_errors: Dict[str, List[MatchRecord]] = {}
+        self.checked_config: Tuple[str, bool, bool] = ("", False, False)
 
         self.current_template = templates[0]
 
+    def loadUserTemplates(self) -> None:
+        """
+        Adds the templates in templates.json in the config directory, see
+        templates.load_templates.
+        """
+        config_dir = os.path.dirname(QSettings().fileName())
+        path = os.path.join(config_dir, "templates.json")
+        if not os.path.exists(path):
+            return
+        try:
+            load_templates(path)
+        except (OSError, ValueError) as e:
+            logger.warning("Cannot load templates from %s: %s", path, e)
+
     def openPreferences(self) -> None:
         from preferences_window import PreferencesWindow
 
         preferencesWindow = PreferencesWindow(self)
         preferencesWindow.exec()
+        # Show the colors that were changed
+        self.highlighter.rehighlight()
 
-    def templateChanged(self, index: int) -> None:
-        from pyLanguageTool import templates
+    def openDiagnostics(self) -> None:
+        from diagnostics_window import DiagnosticsWindow
 
-        template_name = self.template_combo_box.currentText()
-        template = next(
-            (template for template in templates if template["name"] == template_name),
-            None,
+        diagnosticsWindow = DiagnosticsWindow(self, server=self.lt_server)
+        diagnosticsWindow.exec()
+
+    def warmUpChecker(self) -> None:
+        self.checker_pool.warm_up(
+            self.language_codes[self.language_combo_box.currentText()]
         )
+
+    def languageChanged(self, index: int) -> None:
+        # Start the checker while the user is still getting ready to check
+        self.warmUpChecker()
+
+    def templateChanged(self, index: int) -> None:
+        template = find_template(self.template_combo_box.currentText())
         if template:
             self.current_template = template
 
@@ -193,112 +399,553 @@ class TextEditor(QMainWindow):
 
         QSettings().setValue("recentFiles", self.recentFiles)
 
+        self.evict_timer.stop()
+        self.cancelCheck()
+        self.file_scheduler.shutdown()
+        for worker in self.running_workers:
+            worker.wait()
+        self.checker_pool.shutdown()
+        if self.lt_server is not None:
+            # A server this window started goes away with it
+            self.lt_server.stop()
+        if self.match_cache is not None:
+            self.match_cache.close()
+        if self.extraction_cache is not None:
+            self.extraction_cache.close()
+
         event.accept()
 
     def checkText(self) -> None:
+        # A new check supersedes the running one
+        self.cancelCheck()
+        self.check_generation += 1
+
         self.statusBar().showMessage("Checking text with LanguageTool...")
 
-        # Get selected language and re-initialize language_tool
-        selected_language = self.language_codes[self.language_combo_box.currentText()]
-        self.language_tool = language_tool_python.LanguageTool(selected_language)
-
-        text = self.text_display.toPlainText()
-
-        if self.remove_tags_check_box.isChecked():
-            text = re.sub(r"<.*?>", "", text)
-
-        matches = self.language_tool.check(text)
-        self.errors = {}
-        for match in matches:
-            print(f"{Fore.RED}Error: {match.message}{Style.RESET_ALL}")
-            error_type = f"{match.rule_issue_type} - {match.category}"
-            error: Dict[str, Any] = {
-                "Error": error_type,
-                "Message": match.message,
-                "Replacements": match.replacements,
-                "Context": match.context,
-                "Sentence": match.sentence,
-                "Offset": match.offset,
-                "Length": match.error_length,
-            }
-            self.errors[match.offset] = error
+        # The pool reuses a warm checker for the language if there is one
+        selected_language, remove_tags, detect_languages = self.useCheckConfig()
+
+        document = self.text_display.document()
+        with span("collect changes"):
+            segments, reused, blocks = self.collectChanges(document)
 
-        cursor = QTextCursor(self.error_display.document())
+        # Errors of paragraphs checked before are shown right away, the others
+        # appear batch by batch while the check runs. Tags are removed in the
+        # worker, the errors are moved back to the shown text.
+        self.setMatchStore(MatchStore(reused), keep_categories=True)
+        self.highlighter.refreshBlocks(blocks)
 
-        for error in self.errors.values():
-            self.printError(cursor, error)
+        self.pending_check = {
+            "revision": document.revision(),
+            "started": timings.now(),
+        }
+
+        settings = QSettings()
+        self.checkWorker = CheckWorker(
+            self.checker_pool,
+            selected_language,
+            segments,
+            self.check_generation,
+            checker_count=int(settings.value("checker/instancesPerLanguage", 1)),
+            workers=int(settings.value("checker/parallelRequests", 0)),
+            match_cache=self.match_cache,
+            remove_tags=remove_tags,
+            languages=self.checkLanguages(detect_languages),
+        )
+        self.checkWorker.progress.connect(self.checkProgress)
+        self.checkWorker.batchChecked.connect(self.batchChecked)
+        self.checkWorker.checkFinished.connect(self.checkFinished)
+        self.checkWorker.checkFailed.connect(self.checkFailed)
+        self.startWorker(self.checkWorker)
+
+    def useCheckConfig(self) -> Tuple[str, bool, bool]:
+        """
+        Returns the selected language and whether tags are removed and
+        languages detected. The known errors of paragraphs are dropped if any
+        of them changed since the last check.
+        """
+        config = (
+            self.language_codes[self.language_combo_box.currentText()],
+            self.remove_tags_check_box.isChecked(),
+            self.detect_languages_check_box.isChecked(),
+        )
+        if config != self.checked_config:
+            self.block_errors = {}
+            self.checked_config = config
+            # Underlines from the old settings would stay on paragraphs that
+            # the next check skips
+            self.highlighter.rehighlight()
+        return config
+
+    def checkLanguages(self, detect_languages: bool) -> Optional[List[str]]:
+        # Paragraphs in other languages go to the checkers of language_codes
+        return list(self.language_codes.values()) if detect_languages else None
+
+    def collectChanges(
+        self, document: QTextDocument
+    ) -> Tuple[List[Segment], List[MatchRecord], List[int]]:
+        """
+        Returns the paragraphs that need to be checked, the errors of the
+        paragraphs that were checked before (moved to their current position)
+        and the numbers of the edited blocks among those, whose highlighting
+        needs to be redone.
+        """
+        segments: List[Segment] = []
+        reused: List[MatchRecord] = []
+        blocks: List[int] = []
+
+        block = document.begin()
+        while block.isValid():
+            block_text = block.text()
+            position = block.position()
+
+            cached = self.block_errors.get(block_text)
+            if cached is None and not block_text.strip():
+                cached = []
+
+            if cached is None:
+                segments.append(Segment(position, block_text))
+            else:
+                for record in cached:
+                    reused.append(record.moved(position + record.offset))
+                if block.userState() == DIRTY_BLOCK:
+                    blocks.append(block.blockNumber())
+
+            block = block.next()
+
+        return segments, reused, blocks
+
+    def watchDocument(self, document: QTextDocument) -> None:
+        document.contentsChange.connect(self.documentChanged)
+
+    def documentChanged(self, position: int, removed: int, added: int) -> None:
+        # Formatting applied by the checker does not make a paragraph dirty
+        if self.highlighter.highlighting:
+            return
+
+        document = self.text_display.document()
+        block = document.findBlock(position)
+        while block.isValid() and block.position() <= position + added:
+            block.setUserState(DIRTY_BLOCK)
+            block = block.next()
+
+        # Errors after the edit move with the text, so tooltips and the error
+        # list stay right until the next check
+        if len(self.match_store):
+            if self.match_store.edited(position, removed, added):
+                self.error_model.refresh()
+            elif added != removed:
+                self.error_model.offsetsChanged()
+
+    def cancelCheck(self) -> None:
+        if self.checkWorker is not None:
+            self.checkWorker.cancel()
+            self.checkWorker = None
+            self.check_progress_bar.hide()
+            self.statusBar().showMessage("Check cancelled")
+
+    def startWorker(self, worker: QThread) -> None:
+        # Keep a reference until the thread is done, even if it was superseded
+        self.running_workers.append(worker)
+        worker.finished.connect(lambda: self.running_workers.remove(worker))
+        worker.start()
+
+    def checkProgress(self, done: int, total: int) -> None:
+        self.check_progress_bar.setMaximum(total)
+        self.check_progress_bar.setValue(done)
+        self.check_progress_bar.show()
+        if total == 0 and self.checkWorker is not None:
+            if not self.checker_pool.is_ready(self.checkWorker.language):
+                self.statusBar().showMessage("Waiting for LanguageTool to start...")
+                return
+        self.statusBar().showMessage(
+            f"Checking text with LanguageTool... {done}/{total},"
+            f" {len(self.match_store)} errors so far"
+        )
 
-        block_format = cursor.blockFormat()
-        block_format.setBackground(QColor(Qt.GlobalColor.white))
-        cursor.insertBlock()
-        cursor.insertText("\n")
+    def checkFailed(self, generation: int, message: str) -> None:
+        if generation != self.check_generation:
+            return
+        self.checkWorker = None
+        self.check_progress_bar.hide()
+        self.statusBar().showMessage(f"Check failed: {message}")
+
+    def batchChecked(
+        self, generation: int, segments: List[Segment], matches: List[MatchRecord]
+    ) -> None:
+        if generation != self.check_generation or self.checkWorker is None:
+            return
+        document = self.text_display.document()
+        pending = self.pending_check
+        if document.revision() != pending["revision"]:
+            # The offsets are outdated, the text is checked again once the
+            # check is done
+            return
+
+        with span("show batch", matches=len(matches)):
+            first = len(self.match_store)
+            if self.match_store.add(matches):
+                self.error_model.recordsAdded(first)
+            else:
+                self.error_model.refresh()
+
+            categories = {record.category for record in matches}
+            if not categories <= self.error_categories:
+                self.setErrorCategories(self.error_categories | categories)
+
+            blocks = self.rememberBlockErrors(segments, matches)
+            self.highlighter.refreshBlocks(blocks)
+
+        if "first_result" not in pending:
+            pending["first_result"] = timings.now() - pending["started"]
+
+    def checkFinished(self, generation: int, matches: List[MatchRecord]) -> None:
+        # Ignore results of checks that were cancelled or superseded
+        if generation != self.check_generation or self.checkWorker is None:
+            return
+        segments = self.checkWorker.segments
+        stats = self.checkWorker.stats
+        pending = self.pending_check
+        self.checkWorker = None
+        self.pending_check = {}
+        self.check_progress_bar.hide()
+
+        if logger.isEnabledFor(logging.DEBUG):
+            for match in matches:
+                logger.debug("Error at %d: %s", match.offset, match.message)
+        with span("collect errors", matches=len(matches)):
+            self.rememberErrors(segments, matches)
+        # Segments that were not checked, like those in other languages, had
+        # no batch that refreshed their blocks
+        self.highlighter.rehighlight()
+
+        document = self.text_display.document()
+        if document.revision() != pending["revision"]:
+            # The text was edited during the check, check again, which only
+            # checks the paragraphs that are not known yet
+            self.checkText()
+            return
+
+        # The errors were shown batch by batch, only drop categories that no
+        # longer occur
+        self.setErrorCategories({record.category for record in self.match_store})
+        self.clearDirtyBlocks()
+
+        message = f"Text checked ({len(segments)} of {document.blockCount()} paragraphs"
+        if self.match_cache is not None:
+            message += (
+                f", cache hits: {self.match_cache.hits},"
+                f" misses: {self.match_cache.misses}"
+            )
+        if stats.saved:
+            message += (
+                f", saved {stats.saved} checks ({stats.repeated} repeated,"
+                f" {stats.cached} cached)"
+            )
+        if stats.skipped:
+            message += f", skipped {stats.skipped} in other languages"
+        message += ")"
 
-        formatted_text = self.formatText(text)
-        self.text_display.setDocument(formatted_text)
+        phases = timings.summary(
+            ["load file", "remove tags", "check"], since=pending["started"]
+        )
+        if "first_result" in pending:
+            first = f"first errors after {pending['first_result']:.2f} s"
+            phases = f"{phases}, {first}" if phases else first
+        if phases:
+            message += f" – {phases}"
+        self.statusBar().showMessage(message)
+
+    def clearMatchCache(self) -> None:
+        if self.match_cache is None:
+            self.statusBar().showMessage("Match cache is not available")
+            return
+        self.match_cache.clear()
+        self.block_errors = {}
+        self.statusBar().showMessage("Match cache cleared")
+
+    def setMatchStore(
+        self, match_store: MatchStore, keep_categories: bool = False
+    ) -> None:
+        self.match_store = match_store
+        self.text_display.match_store = match_store
+
+        categories = {record.category for record in match_store}
+        if keep_categories:
+            # The categories of the errors still to come stay selectable
+            categories |= self.error_categories
+        self.setErrorCategories(categories)
+
+        self.error_model.setMatchStore(match_store)
+
+    def setErrorCategories(self, categories: Set[str]) -> None:
+        if categories == self.error_categories:
+            return
+        self.error_categories = categories
+
+        # Keep the selected category if it still occurs, without a selected
+        # one the rows stay as they are
+        category = self.error_model.category
+        if category and category not in categories:
+            self.error_model.setFilter("", self.error_filter_edit.text())
+        self.error_category_combo_box.blockSignals(True)
+        self.error_category_combo_box.clear()
+        self.error_category_combo_box.addItem("All categories")
+        self.error_category_combo_box.addItems(sorted(categories))
+        index = self.error_category_combo_box.findText(self.error_model.category)
+        self.error_category_combo_box.setCurrentIndex(max(index, 0))
+        self.error_category_combo_box.blockSignals(False)
+
+    def errorFilterChanged(self) -> None:
+        category = ""
+        if self.error_category_combo_box.currentIndex() > 0:
+            category = self.error_category_combo_box.currentText()
+        self.error_model.setFilter(category, self.error_filter_edit.text())
+
+    def errorSelected(self, index: QModelIndex) -> None:
+        record = self.error_model.record(index)
+        if record is None:
+            return
+
+        # Select the error in the text and scroll to it
+        cursor = self.text_display.textCursor()
+        cursor.setPosition(record.offset)
+        cursor.setPosition(record.end, QTextCursor.MoveMode.KeepAnchor)
+        self.text_display.setTextCursor(cursor)
+        self.text_display.ensureCursorVisible()
+        self.statusBar().showMessage(f"{record.error_type()}: {record.message}")
+
+    def errorClicked(self, position: int) -> None:
+        row = self.error_model.rowOf(position)
+        if row >= 0:
+            index = self.error_model.index(row, 0)
+            self.error_view.selectRow(row)
+            self.error_view.scrollTo(index)
+
+    def rememberErrors(
+        self, segments: List[Segment], matches: List[MatchRecord]
+    ) -> None:
+        """
+        Stores the errors of the checked segments relative to the segment start.
+        """
+        segment_errors: List[List[MatchRecord]] = [[] for _ in segments]
+        starts = [segment.offset for segment in segments]
+        for record in matches:
+            index = bisect_right(starts, record.offset) - 1
+            segment_errors[index].append(record.moved(record.offset - starts[index]))
+
+        for segment in segments:
+            self.block_errors.pop(segment.text, None)
+        for segment, errors_in_segment in zip(segments, segment_errors):
+            self.block_errors.setdefault(segment.text, errors_in_segment)
+
+        # Forget paragraphs that are no longer in the document
+        document = self.text_display.document()
+        if len(self.block_errors) > 2 * document.blockCount() + 1000:
+            current = set(self.text_display.toPlainText().split("\n"))
+            self.block_errors = {
+                text: errors
+                for text, errors in self.block_errors.items()
+                if text in current
+            }
 
-        self.statusBar().showMessage("Text checked")
+    def rememberBlockErrors(
+        self, segments: List[Segment], matches: List[MatchRecord]
+    ) -> List[int]:
+        """
+        Stores the errors of a checked batch by the text of their blocks and
+        returns the block numbers.
+        """
+        document = self.text_display.document()
+        blocks = {}
+        for segment in segments:
+            block = document.findBlock(segment.offset)
+            blocks[block.position()] = block
+        starts = sorted(blocks)
+
+        block_errors: Dict[int, List[MatchRecord]] = {start: [] for start in starts}
+        for record in matches:
+            start = starts[bisect_right(starts, record.offset) - 1]
+            block_errors[start].append(record.moved(record.offset - start))
+        for start, errors in block_errors.items():
+            self.block_errors[blocks[start].text()] = errors
+
+        return [blocks[start].blockNumber() for start in starts]
+
+    def clearDirtyBlocks(self) -> None:
+        block = self.text_display.document().begin()
+        while block.isValid():
+            block.setUserState(-1)
+            block = block.next()
 
     def fileLoaded(self, text: str) -> None:
+        # A file opened since then replaced this one
+        if self.sender() is not self.fileLoaderWorker:
+            return
+        self.shown_project_file = ""
+        self.project_list.setCurrentItem(None)
         self.text_display.setPlainText(text)
         self.checkText()
+        # The status bar summary includes loading the file
+        self.pending_check["started"] = self.load_started
 
         self.addRecentFile(self.fileLoaderWorker.file_name)
         self.statusBar().showMessage("File loaded")
 
+    def prefetchRecentFile(self) -> None:
+        """
+        Extracts the most recent file in the background, so it opens from the
+        extraction cache.
+        """
+        if not self.recentFiles or self.extraction_cache is None:
+            return
+        file_name = self.recentFiles[0]
+        # Plain text is not cached, reading it now would be wasted
+        if not os.path.isfile(file_name) or is_plain_text(file_name):
+            return
+
+        file_handler = FileHandler(self.current_template, self.extraction_cache)
+
+        def prefetch() -> None:
+            try:
+                file_handler.load_file(file_name)
+            except Exception as e:
+                logger.info("Prefetching %s failed: %s", file_name, e)
+
+        thread = threading.Thread(target=prefetch, name="prefetch")
+        thread.daemon = True
+        thread.start()
+
     def openFile(self) -> None:
         file_name, _ = QFileDialog.getOpenFileName(self, "Open File")
         if file_name:
-            from file_loader_worker import FileLoaderWorker
-
-            self.fileLoaderWorker = FileLoaderWorker(self, file_name)
-            self.fileLoaderWorker.fileLoaded.connect(self.fileLoaded)
-            self.fileLoaderWorker.start()
-
-    def formatText(self, text: str) -> QTextDocument:
-        document = QTextDocument()
-        cursor = QTextCursor(document)
-
-        # Display the text in the QTextEdit
-        # cursor.insertText(text)
-
-        format = QTextCharFormat()
-
-        # Get a list of all keys (offsets) in the errors dictionary
-        keys = list(self.errors.keys())
-
-        current_error = None
-
-        # Loop through the text and add formatting based on the offset and length
-        for character in text:
-            offset = cursor.position()
-            if offset in keys:
-                error = self.errors[offset]
-                format.setFontUnderline(True)
-
-                error_type = error["Error"].split(" - ")[0]
-                from pyLanguageTool import error_type_color_map
-
-                underline_color = error_type_color_map.get(
-                    error_type, QColor(0, 0, 0, 128)  # semi-transparent black
-                )
-                format.setUnderlineColor(underline_color)
-                format.setUnderlineStyle(
-                    QTextCharFormat.UnderlineStyle.SpellCheckUnderline
-                )
-                format.setToolTip(
-                    f"{error['Error']}\n{error['Message']}\n→ {error['Replacements']}\nContext: {error['Context']}\n{error['Sentence']}"
-                )
-                format.setAnchor(True)
-                format.setAnchorHref(f"#{offset}")
-                format.setBackground(QColor(underline_color).lighter(190))
-                current_error = error
-            elif current_error:
-                if offset == error["Offset"] + error["Length"]:
-                    format = QTextCharFormat()
-                    current_error = None
-
-            cursor.insertText(character, format)
-        return document
+            self.loadFile(file_name)
+
+    def loadFile(self, file_name: str) -> None:
+        # Results of a running check would belong to the previous file
+        self.cancelCheck()
+
+        self.load_started = timings.now()
+        self.fileLoaderWorker = FileLoaderWorker(self, file_name)
+        self.fileLoaderWorker.fileLoaded.connect(self.fileLoaded)
+        self.startWorker(self.fileLoaderWorker)
+
+    def openFiles(self) -> None:
+        file_names, _ = QFileDialog.getOpenFileNames(self, "Open Files")
+        if file_names:
+            self.addProjectFiles(file_names)
+
+    def checkRecentFiles(self) -> None:
+        self.addProjectFiles(
+            [file_name for file_name in self.recentFiles if os.path.isfile(file_name)]
+        )
+
+    def addProjectFiles(self, file_names: List[str]) -> None:
+        if not file_names:
+            return
+        language, remove_tags, detect_languages = self.useCheckConfig()
+        options = {
+            "template": self.current_template,
+            "language": language,
+            "remove_tags": remove_tags,
+            "detect_languages": detect_languages,
+        }
+        for file_name in file_names:
+            if file_name not in self.project_items:
+                item = QListWidgetItem(os.path.basename(file_name))
+                item.setToolTip(file_name)
+                item.setData(Qt.ItemDataRole.UserRole, file_name)
+                self.project_list.addItem(item)
+                self.project_items[file_name] = item
+        self.project_list.show()
+
+        self.file_scheduler.add(file_names, options)
+        for file_name in file_names:
+            self.updateProjectFile(file_name)
+        self.project_list.setCurrentItem(self.project_items[file_names[0]])
+
+    def projectFileSelected(
+        self, current: Optional[QListWidgetItem], previous: Any
+    ) -> None:
+        if current is None:
+            return
+        file_name = current.data(Qt.ItemDataRole.UserRole)
+        if file_name == self.shown_project_file:
+            return
+        self.shown_project_file = file_name
+        self.file_scheduler.prioritize(file_name)
+
+        job = self.file_scheduler.job(file_name)
+        if job is not None and job.status == DONE:
+            self.showProjectFile(job)
+        else:
+            self.statusBar().showMessage(f"Loading {os.path.basename(file_name)}...")
+
+    def updateProjectFile(self, file_name: str) -> None:
+        item = self.project_items.get(file_name)
+        job = self.file_scheduler.job(file_name)
+        if item is None or job is None:
+            return
+
+        status = job.status
+        if job.status == DONE:
+            status = f"{len(job.matches)} errors"
+        elif job.status == FAILED:
+            status = f"failed: {job.error}"
+        item.setText(f"{os.path.basename(file_name)} – {status}")
+
+        if job.status == DONE and file_name == self.shown_project_file:
+            self.showProjectFile(job)
+        elif job.status == FAILED and file_name == self.shown_project_file:
+            self.statusBar().showMessage(f"Loading {file_name} failed: {job.error}")
+
+    def showProjectFile(self, job: FileJob) -> None:
+        """
+        Shows a file checked in the background. Its errors are known if the
+        language, tag and language detection settings did not change since,
+        so the check right after only checks the paragraphs that were edited.
+        """
+        self.cancelCheck()
+        config = self.useCheckConfig()
+        self.text_display.setPlainText(job.text)
+        options = job.options
+        job_config = (
+            options["language"],
+            options["remove_tags"],
+            options["detect_languages"],
+        )
+        if job_config == config:
+            self.rememberErrors(split_segments(job.text), job.matches)
+        self.checkText()
+        self.addRecentFile(job.file_name)
+
+    def loadProjectFile(self, job: FileJob) -> str:
+        # Runs in a scheduler thread
+        file_handler = FileHandler(job.options["template"], self.extraction_cache)
+        return file_handler.load_file(job.file_name)
+
+    def checkProjectFile(
+        self, job: FileJob, is_cancelled: Callable[[], bool]
+    ) -> List[MatchRecord]:
+        # Runs in a scheduler thread
+        language = job.options["language"]
+        segments = split_segments(job.text)
+        offset_map: Optional[OffsetMap] = None
+        if job.options["remove_tags"]:
+            segments, offset_map = strip_segments(segments)
+        groups = {language: segments}
+        languages = self.checkLanguages(job.options["detect_languages"])
+        if languages:
+            groups, _ = route_segments(segments, language, languages)
+        # One request at a time, so the shown file is checked faster
+        return check_languages(
+            groups,
+            lambda language: self.checker_pool.checkers(language, 1),
+            workers=1,
+            is_cancelled=is_cancelled,
+            cache=self.match_cache,
+            offset_map=offset_map,
+        )
 
     def addRecentFile(self, file_name: str) -> None:
         if file_name in self.recentFiles:
@@ -308,9 +955,7 @@ class TextEditor(QMainWindow):
 
     def openRecentFile(self, file_name: str) -> None:
         if file_name:
-            self.fileLoaderWorker = FileLoaderWorker(self, file_name)
-            self.fileLoaderWorker.fileLoaded.connect(self.fileLoaded)
-            self.fileLoaderWorker.start()
+            self.loadFile(file_name)
         self.addRecentFile(file_name)
 
     def updateRecentFilesMenu(self) -> None:
@@ -336,40 +981,6 @@ class TextEditor(QMainWindow):
         self.move(pos)
         self.resize(size)
 
-    def printError(self, cursor: QTextCursor, error: Dict[str, Any]) -> None:
-        # Get color based on error type
-        error_type = error["Error"].split(" - ")[0]
-        from pyLanguageTool import error_type_color_map
-
-        color = QColor(error_type_color_map.get(error_type, Qt.GlobalColor.yellow))
-
-        for field_name, field_value in error.items():
-            if field_name == "Offset" or field_name == "Length":
-                continue
-            # Ignore replacements if there are none
-            if field_name == "Replacements" and field_value != [" "]:
-                continue
-
-            block_format = cursor.blockFormat()
-            # block_format.setTopMargin(10)
-            block_format.setBackground(color.lighter(190))
-            # block_format.setForeground(Qt.GlobalColor.black)
-
-            cursor.setBlockFormat(block_format)
-            cursor.insertBlock()
-            format = QTextCharFormat()
-
-            format.setForeground(Qt.GlobalColor.black)
-            format.setFontWeight(QFont.Weight.Bold)
-
-            cursor.insertText(f"{field_name}: ", format)
-
-            format.setFontWeight(QFont.Weight.Normal)
-            # format = QTextCharFormat()
-            # format.setForeground(Qt.GlobalColor.black)
-
-            cursor.insertText(f"{field_value}\n", format)
-
     def eventFilter(self, obj: QObject, event: QEvent) -> bool:  # type: ignore[override]
         # Only handle events for the text display
         if obj is self.text_display:
@@ -432,4 +1043,4 @@ class TextEditor(QMainWindow):
                     file_path = file_path[7:]
                 self.openRecentFile(file_path)
         except Exception as e:
-            print(f"Error loading recent file from desktop: {e}")
+            logger.warning("Error loading recent file from desktop: %s", e)
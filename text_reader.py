@@ -0,0 +1,97 @@
+import codecs
+import locale
+import mmap
+from typing import Iterator, Tuple
+
+# Text is decoded in pieces of about this many bytes
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Bytes looked at to guess the encoding of files without a BOM
+SAMPLE_SIZE = 64 * 1024
+
+# Longest first, the UTF-32 LE BOM starts with the UTF-16 LE BOM
+BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+]
+
+
+def detect_encoding(head: bytes) -> Tuple[str, int]:
+    """
+    Returns the encoding of a file starting with head and the length of its
+    byte order mark. Without one, UTF-16 is recognized by its zero bytes and
+    UTF-8 by decoding the sample. Other files are read with the platform
+    encoding, or cp1252 where that is UTF-8.
+    """
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding, len(bom)
+
+    sample = head[:SAMPLE_SIZE]
+    if len(sample) >= 4:
+        # ASCII text in UTF-16 has every other byte zero
+        even_zeros = sample[0::2].count(0)
+        odd_zeros = sample[1::2].count(0)
+        if odd_zeros > len(sample) * 0.4 and even_zeros == 0:
+            return "utf-16-le", 0
+        if even_zeros > len(sample) * 0.4 and odd_zeros == 0:
+            return "utf-16-be", 0
+
+    try:
+        # A character cut off at the end of the sample is fine
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8", 0
+    except UnicodeDecodeError:
+        pass
+    encoding = locale.getpreferredencoding(False)
+    if codecs.lookup(encoding).name == "utf-8":
+        encoding = "cp1252"
+    return encoding, 0
+
+
+def _normalize_newlines(text: str) -> str:
+    if "\r" not in text:
+        return text
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def iter_text_chunks(file_name: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Decodes a text file piece by piece from a memory map. Chunks end with a
+    line break, except the last one and pieces of lines longer than a chunk,
+    and line breaks are "\\n" like in text mode. Undecodable bytes are
+    replaced.
+    """
+    with open(file_name, "rb") as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return
+
+        with data:
+            encoding, start = detect_encoding(data[:SAMPLE_SIZE])
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            rest = ""
+            for position in range(start, len(data), chunk_size):
+                text = rest + decoder.decode(data[position : position + chunk_size])
+                # Old Mac files only have "\r". A "\r" at the end stays, so
+                # "\r\n" is not split between chunks.
+                end = max(text.rfind("\n"), text.rfind("\r", 0, len(text) - 1)) + 1
+                if not end:
+                    # Keeping a line without breaks for the next chunk would
+                    # copy it again and again
+                    end = len(text) - text.endswith("\r")
+                rest = text[end:]
+                if end:
+                    yield _normalize_newlines(text[:end])
+            rest += decoder.decode(b"", final=True)
+            if rest:
+                yield _normalize_newlines(rest)
+
+
+def read_text(file_name: str) -> str:
+    return "".join(iter_text_chunks(file_name))
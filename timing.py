@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Only the most recent spans are kept
+MAX_SPANS = 10000
+
+
+class Span(NamedTuple):
+    name: str
+    start: float
+    duration: float
+    thread: str
+    args: Dict[str, Any]
+
+
+class Timings:
+    """
+    Records how long the phases of loading and checking take. Spans can be
+    recorded from any thread and exported in the Chrome trace format
+    (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, max_spans: int = MAX_SPANS) -> None:
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Times the block. The yielded dict can be used to add details, like
+        the number of segments, once they are known.
+        """
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            duration = time.perf_counter() - start
+            span = Span(
+                name,
+                start - self._origin,
+                duration,
+                threading.current_thread().name,
+                args,
+            )
+            with self._lock:
+                self._spans.append(span)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s took %.1f ms %s", name, duration * 1000, args or "")
+
+    def now(self) -> float:
+        """
+        Returns the current time on the clock of the span start times.
+        """
+        return time.perf_counter() - self._origin
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def last(self, name: str, since: float = 0.0) -> Optional[Span]:
+        with self._lock:
+            for span in reversed(self._spans):
+                if span.name == name and span.start >= since:
+                    return span
+        return None
+
+    def summary(self, names: List[str], since: float = 0.0) -> str:
+        """
+        Returns the last duration of each of the named phases that started
+        after since, like "load file 0.42 s, check 1.30 s".
+        """
+        parts = []
+        for name in names:
+            span = self.last(name, since)
+            if span is not None:
+                parts.append(f"{name} {span.duration:.2f} s")
+        return ", ".join(parts)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        threads: Dict[str, int] = {}
+        events = []
+        for span in self.spans():
+            tid = threads.setdefault(span.thread, len(threads) + 1)
+            events.append(
+                {
+                    "name": span.name,
+                    "ph": "X",
+                    "ts": round(span.start * 1e6),
+                    "dur": round(span.duration * 1e6),
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": {key: str(value) for key, value in span.args.items()},
+                }
+            )
+        for thread, tid in threads.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": {"name": thread},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.chrome_trace(), file)
+
+
+timings = Timings()
+span = timings.span
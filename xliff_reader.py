@@ -0,0 +1,101 @@
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Optional, Tuple
+
+XLIFF_1_2 = "urn:oasis:names:tc:xliff:document:1.2"
+XLIFF_2_0 = "urn:oasis:names:tc:xliff:document:2.0"
+
+# Inline elements whose content is native code, not translatable text
+CODE_ELEMENTS = {"ph", "bpt", "ept", "it"}
+
+
+def _split_tag(tag: str) -> Tuple[str, str]:
+    if tag.startswith("{"):
+        namespace, _, name = tag[1:].partition("}")
+        return namespace, name
+    return "", tag
+
+
+def inline_text(element: ET.Element) -> str:
+    """
+    Returns the text of a <target>, including the text of inline elements
+    like <g>, <mrk> and <pc>, but not the native code in <ph>, <bpt>, <ept>
+    and <it>.
+    """
+    parts: List[str] = []
+
+    def collect(element: ET.Element) -> None:
+        if element.text:
+            parts.append(element.text)
+        for child in element:
+            _, name = _split_tag(child.tag)
+            if name == "cp":
+                # XLIFF 2.0 code point of a character that is invalid in XML
+                try:
+                    parts.append(chr(int(child.get("hex", ""), 16)))
+                except ValueError:
+                    pass
+            elif name not in CODE_ELEMENTS:
+                collect(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    collect(element)
+    return "".join(parts)
+
+
+def read_targets(source) -> Iterator[Tuple[str, str]]:
+    """
+    Reads an XLIFF 1.2 / 2.0 or Memsource MXLIFF file and yields a
+    (unit id, target text) tuple for every non-empty target, in document
+    order. Elements are removed from the tree once they are read, so memory
+    use does not grow with the file size.
+    """
+    stack: List[ET.Element] = []
+    unit_id = ""
+    segment_id: Optional[str] = None
+    target_depth = 0
+    alt_trans_depth = 0
+
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        namespace, name = _split_tag(element.tag)
+        is_xliff = namespace in (XLIFF_1_2, XLIFF_2_0)
+
+        if event == "start":
+            stack.append(element)
+            if not is_xliff or target_depth:
+                if target_depth:
+                    target_depth += 1
+                continue
+            if name in ("trans-unit", "unit"):
+                unit_id = element.get("id", "")
+                segment_id = None
+            elif name == "segment" and namespace == XLIFF_2_0:
+                segment_id = element.get("id")
+            elif name == "alt-trans":
+                alt_trans_depth += 1
+            elif name == "target":
+                target_depth = 1
+            continue
+
+        stack.pop()
+        if target_depth > 1:
+            # Inline elements are read together with their target
+            target_depth -= 1
+            continue
+
+        if target_depth == 1:
+            target_depth = 0
+            # Targets in <alt-trans> are suggestions, not the translation
+            if not alt_trans_depth:
+                text = inline_text(element)
+                if text:
+                    if segment_id:
+                        yield f"{unit_id}/{segment_id}", text
+                    else:
+                        yield unit_id, text
+        elif is_xliff and name == "alt-trans":
+            alt_trans_depth -= 1
+
+        # Drop the finished element from its parent to free memory
+        if stack:
+            stack[-1].remove(element)